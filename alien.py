@@ -2,19 +2,23 @@ import os
 import sys
 import threading
 import time
-import requests
+STARTUP_STARTED = time.perf_counter() # Taken first so --startup-trace also counts the imports below
 import json
 import subprocess
 import sqlite3
 import textwrap
 import configparser
-import webbrowser
 import shutil
 import argparse
+import heapq
+import zlib
 import re
 import html
 from pathlib import Path
-from urllib.parse import urlparse, quote
+from array import array
+from collections import OrderedDict, deque
+from urllib.parse import urlparse, quote, parse_qs, parse_qsl, urlencode
+from urllib.request import url2pathname
 import pid # Added for single-instance locking
 
 # --- Platform-specific imports for direct keyboard input ---
@@ -213,6 +217,7 @@ def get_config_dir():
 
 CONFIG_DIR = get_config_dir()
 CONFIG_FILE = CONFIG_DIR / "config.ini"
+SHARED_DB_FILE = CONFIG_DIR / "news_feed_shared.db"
 
 # --- Globals that will be set by profile loader ---
 DB_FILE = None
@@ -221,40 +226,98 @@ FETCH_INTERVAL_SECONDS = 300
 SHOW_CLOCK = True
 VIDEO_PLAYER_PATH = "mpv"
 BLOCKED_DOMAINS = set()
-NEEDS_RESTART = False
 PAGE_JUMP = 10
+WINDOWED_VIEW_THRESHOLD = 20000 # Histories larger than this are paged from the DB instead of loaded whole
 HIGHLIGHT_KEYWORDS = set()
 MUTE_KEYWORDS = set()
+RETENTION_DAYS = 0 # 0 keeps articles forever
+RETENTION_MAX_ARTICLES = 0 # 0 means no row limit
+RETENTION_KEEP_BOOKMARKS = True
+TOMBSTONE_DAYS = 30 # Deleted URLs stay blocked from re-import this long; 0 keeps them forever
+BACKUP_COMPRESSION = None # None, 'gzip' or 'zstd'
+BACKUP_KEEP = 10 # Full backups kept in the backups folder; 0 keeps all
+SHARED_ARTICLE_STORE = False # All profiles keep their articles in SHARED_DB_FILE instead of a DB each
 CONNECTION_OK = True
 
 data_lock = threading.Lock()
 last_checked_time = "Never"
 ARTICLES_UPDATED, HAS_NEW_ARTICLES = threading.Event(), False
 stop_thread_event = threading.Event()
+fetch_now_event = threading.Event() # Cuts the fetcher's wait short, e.g. right after a profile switch
+VISIBLE_ARTICLE_URLS = () # URLs of the rows on screen, set by the UI for the engagement refresher
 
 # --- Settings Management ---
+class ConfigStore:
+    """
+    config.ini, parsed once and kept in memory. save() writes a temp file and
+    renames it over config.ini, so a crash never leaves a half-written config;
+    reload_if_changed() picks up edits made to the file outside the app.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self.reload()
+
+    def _stamp(self):
+        try: stat = os.stat(self.path)
+        except FileNotFoundError: return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self):
+        config = configparser.ConfigParser()
+        with self._lock:
+            self.stamp = self._stamp()
+            config.read(self.path)
+            self.config = config
+
+    def reload_if_changed(self):
+        """Re-reads config.ini if it changed since it was last read or written here; True if it did."""
+        if self._stamp() == self.stamp: return False
+        self.reload()
+        return True
+
+    def save(self):
+        with self._lock:
+            temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w') as f:
+                self.config.write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.stamp = self._stamp()
+
+CONFIG = ConfigStore(CONFIG_FILE)
+CONFIG_CHECK_SECONDS = 2 # How often the UI looks for edits to config.ini
+
 def setup_config():
     """Ensures config.ini exists and is in the new profile format."""
-    config = configparser.ConfigParser()
-    if not CONFIG_FILE.exists() or not CONFIG_FILE.read_text().strip():
+    CONFIG.reload_if_changed()
+    config = CONFIG.config
+    if not config.sections():
         # Create a brand new config
         config['Settings'] = {'ActiveProfile': 'Main'}
         config['Profile:Main'] = {
             'Subreddits': 'news+worldnews+politics+technology',
             'DatabaseFile': 'news_feed_main.db',
             'HighlightKeywords': '',
-            'MuteKeywords': ''
+            'MuteKeywords': '',
+            'RetentionDays': '0',
+            'RetentionMaxArticles': '0',
+            'RetentionKeepBookmarks': 'true',
+            'TombstoneDays': '30'
         }
         config['General'] = {
             'Theme': 'Default',
             'FetchInterval': '300',
             'ShowClock': 'true',
-            'BlockedDomains': ''
+            'BlockedDomains': '',
+            'BackupCompression': 'none',
+            'BackupKeep': '10',
+            'SharedArticleStore': 'false'
         }
-        with open(CONFIG_FILE, 'w') as f: config.write(f)
-    elif "[Profile:Main]" not in CONFIG_FILE.read_text():
+        CONFIG.save()
+    elif not config.has_section('Profile:Main'):
         # Upgrade old config to new profile format
-        config.read(CONFIG_FILE)
         old_settings = dict(config['Settings'])
 
         config.clear() # Clear existing structure
@@ -272,13 +335,21 @@ def setup_config():
             'ShowClock': old_settings.get('showclock', 'true'),
             'BlockedDomains': old_settings.get('blockeddomains', '')
         }
-        with open(CONFIG_FILE, 'w') as f: config.write(f)
+        CONFIG.save()
 
-def load_profile_settings():
+def profile_db_path(profile_name):
+    """The DB path the config gives `profile_name`: its own DB file, or its view of the shared store."""
+    config = CONFIG.config
+    if config['General'].getboolean('SharedArticleStore', False): return shared_store_path(profile_name)
+    return CONFIG_DIR / config[f"Profile:{profile_name}"].get('DatabaseFile', 'news_feed_main.db')
+
+def load_profile_settings(profile_name=None):
+    """Sets the settings globals from the config, for `profile_name` or else the active profile."""
     global DB_FILE, SUBREDDITS_STRING, FETCH_INTERVAL_SECONDS, SHOW_CLOCK, BLOCKED_DOMAINS, HIGHLIGHT_KEYWORDS, MUTE_KEYWORDS, VIDEO_PLAYER_PATH
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
-    active_profile = config.get('Settings', 'ActiveProfile', fallback='Main')
+    global RETENTION_DAYS, RETENTION_MAX_ARTICLES, RETENTION_KEEP_BOOKMARKS, TOMBSTONE_DAYS, BACKUP_COMPRESSION, BACKUP_KEEP, SHARED_ARTICLE_STORE
+    CONFIG.reload_if_changed()
+    config = CONFIG.config
+    active_profile = profile_name or config.get('Settings', 'ActiveProfile', fallback='Main')
     profile_section = f"Profile:{active_profile}"
     if not config.has_section(profile_section):
         active_profile = "Main"
@@ -286,57 +357,59 @@ def load_profile_settings():
     profile_settings = config[profile_section]
     general_settings = config['General']
     SUBREDDITS_STRING = profile_settings.get('Subreddits', 'news+worldnews+politics+technology')
-    db_filename = profile_settings.get('DatabaseFile', 'news_feed_main.db')
-    DB_FILE = CONFIG_DIR / db_filename
+    SHARED_ARTICLE_STORE = general_settings.getboolean('SharedArticleStore', False)
+    DB_FILE = profile_db_path(active_profile)
     FETCH_INTERVAL_SECONDS = general_settings.getint('FetchInterval', 60)
     SHOW_CLOCK = general_settings.getboolean('ShowClock', True)
     VIDEO_PLAYER_PATH = general_settings.get('VideoPlayerPath', 'mpv')
     blocked_str = general_settings.get('BlockedDomains', '')
+    compression = general_settings.get('BackupCompression', 'none').strip().lower()
+    BACKUP_COMPRESSION = compression if compression in ('gzip', 'zstd') else None
+    BACKUP_KEEP = general_settings.getint('BackupKeep', 10)
     BLOCKED_DOMAINS = {domain.strip() for domain in blocked_str.split(',') if domain.strip()}
     highlight_str = profile_settings.get('HighlightKeywords', '')
     mute_str = profile_settings.get('MuteKeywords', '')
     HIGHLIGHT_KEYWORDS = {kw.strip().lower() for kw in highlight_str.split(',') if kw.strip()}
     MUTE_KEYWORDS = {kw.strip().lower() for kw in mute_str.split(',') if kw.strip()}
+    RETENTION_DAYS = profile_settings.getfloat('RetentionDays', 0)
+    RETENTION_MAX_ARTICLES = profile_settings.getint('RetentionMaxArticles', 0)
+    RETENTION_KEEP_BOOKMARKS = profile_settings.getboolean('RetentionKeepBookmarks', True)
+    TOMBSTONE_DAYS = profile_settings.getfloat('TombstoneDays', 30)
     return general_settings.get('Theme', 'Default'), active_profile
 
 def save_general_settings(theme_name, fetch_interval, show_clock, blocked_domains, video_player_path):
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     blocked_domains_str = ','.join(sorted(list(blocked_domains)))
-    config['General'] = {
+    if not config.has_section('General'): config.add_section('General')
+    config['General'].update({
         'Theme': theme_name,
         'FetchInterval': str(fetch_interval),
         'ShowClock': str(show_clock),
         'BlockedDomains': blocked_domains_str,
         'VideoPlayerPath': video_player_path
-    }
-    with open(CONFIG_FILE, 'w') as f: config.write(f)
+    }) # Keys without a settings row (e.g. BackupKeep) are left as they are
+    CONFIG.save()
 
 def save_profile_keywords(profile_name, highlight_keywords, mute_keywords):
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     section_name = f"Profile:{profile_name}"
     if config.has_section(section_name):
         config.set(section_name, 'HighlightKeywords', highlight_keywords)
         config.set(section_name, 'MuteKeywords', mute_keywords)
-        with open(CONFIG_FILE, 'w') as f:
-            config.write(f)
+        CONFIG.save()
 
 def get_all_profiles():
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     return sorted([section.split(':')[1] for section in config.sections() if section.startswith('Profile:')])
 
 def set_active_profile(profile_name):
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     if not config.has_section('Settings'): config.add_section('Settings')
     config.set('Settings', 'ActiveProfile', profile_name)
-    with open(CONFIG_FILE, 'w') as f: config.write(f)
+    CONFIG.save()
 
 def create_profile(profile_name):
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     section_name = f"Profile:{profile_name}"
     if config.has_section(section_name): return False
     config.add_section(section_name)
@@ -345,18 +418,22 @@ def create_profile(profile_name):
     config.set(section_name, 'DatabaseFile', db_filename)
     config.set(section_name, 'HighlightKeywords', '')
     config.set(section_name, 'MuteKeywords', '')
-    with open(CONFIG_FILE, 'w') as f: config.write(f)
+    config.set(section_name, 'RetentionDays', '0')
+    config.set(section_name, 'RetentionMaxArticles', '0')
+    config.set(section_name, 'RetentionKeepBookmarks', 'true')
+    config.set(section_name, 'TombstoneDays', '30')
+    CONFIG.save()
     return True
 
 def delete_profile(profile_name):
     if profile_name == 'Main': return False
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     section_name = f"Profile:{profile_name}"
     if config.has_section(section_name):
         db_filename = config.get(section_name, 'DatabaseFile', fallback=None)
         config.remove_section(section_name)
-        with open(CONFIG_FILE, 'w') as f: config.write(f)
+        CONFIG.save()
+        if SHARED_ARTICLE_STORE: remove_shared_profile(profile_name)
         if db_filename:
             db_path = CONFIG_DIR / db_filename
             if db_path.exists(): db_path.unlink()
@@ -365,8 +442,7 @@ def delete_profile(profile_name):
 
 def rename_profile(old_name, new_name):
     if old_name == 'Main' or not new_name.strip(): return False
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     old_section, new_section = f"Profile:{old_name}", f"Profile:{new_name}"
     if not config.has_section(old_section) or config.has_section(new_section): return False
     items = dict(config.items(old_section))
@@ -377,90 +453,834 @@ def rename_profile(old_name, new_name):
     for key, value in items.items(): config.set(new_section, key, value)
     config.remove_section(old_section)
     if config.get('Settings', 'ActiveProfile') == old_name: config.set('Settings', 'ActiveProfile', new_name)
-    with open(CONFIG_FILE, 'w') as f: config.write(f)
+    CONFIG.save()
     new_db_path = CONFIG_DIR / new_db_filename
     if old_db.exists(): old_db.rename(new_db_path)
+    if SHARED_ARTICLE_STORE: rename_shared_profile(old_name, new_name)
     return True
 
 def update_profile_subreddits(profile_name, subreddits):
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     section_name = f"Profile:{profile_name}"
     if config.has_section(section_name) and subreddits.strip():
         config.set(section_name, 'Subreddits', subreddits)
-        with open(CONFIG_FILE, 'w') as f: config.write(f)
+        CONFIG.save()
         return True
     return False
 
+# --- Database Connections ---
+# Applied to every connection db_connection opens; WAL itself is persistent and set once by init_db
+DB_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",    # WAL keeps this crash-safe; only the last commits can be lost on power failure
+    "PRAGMA cache_size = -16384",     # 16 MiB page cache, kept warm across calls
+    "PRAGMA mmap_size = 268435456",   # Read up to 256 MiB of the file through the page cache of the OS
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+SLOW_QUERY_MS = None # Set by --log-slow-queries; statements slower than this are appended to SLOW_QUERY_LOG
+_db_local = threading.local()
+# Bumped per path (None: every path) by close_db_connections; a thread's connection opened under older values is reopened
+_db_generations, _db_generations_lock = {None: 0}, threading.Lock()
+
+def _log_slow_query(sql, started):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if threading.current_thread() is threading.main_thread(): UI_STATS.record('db', elapsed_ms)
+    if SLOW_QUERY_MS is None or elapsed_ms < SLOW_QUERY_MS: return
+    with open(CONFIG_DIR / "slow_queries.log", 'a', encoding='utf-8') as f:
+        f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {elapsed_ms:9.1f} ms [{threading.current_thread().name}] {' '.join(sql.split())}\n")
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that logs statements slower than SLOW_QUERY_MS (for SELECTs, the time to the first row)."""
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        try: return super().execute(sql, params)
+        finally: _log_slow_query(sql, started)
+
+    def executemany(self, sql, seq_of_params):
+        started = time.perf_counter()
+        try: return super().executemany(sql, seq_of_params)
+        finally: _log_slow_query(sql, started)
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try: return super().executescript(sql_script)
+        finally: _log_slow_query(sql_script, started)
+
+class _Connection(sqlite3.Connection):
+    profile_id = None # Set on connections scoped to one profile of the shared store
+    generation = None # The _db_generations entries it was opened under
+
+class _TimedConnection(_Connection):
+    # Connection.execute and friends go through cursor(), so this covers them too
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+def db_connection(db_path=None):
+    """
+    Returns the calling thread's long-lived connection to `db_path` (the active
+    profile's DB by default), opening and tuning it on first use. Use it as
+    `with db_connection() as conn:` for a transaction; the connection stays open.
+    """
+    path = str(db_path or DB_FILE)
+    conns = _db_local.__dict__.setdefault('conns', {})
+    conn, generation = conns.get(path), (_db_generations[None], _db_generations.get(path, 0))
+    if conn is not None and conn.generation != generation: # Closed by another thread, e.g. before the file was replaced
+        conns.pop(path).close()
+        conn = None
+    if conn is None:
+        # The UI thread's statements are always timed, for the performance overlay
+        factory = _Connection if SLOW_QUERY_MS is None and threading.current_thread() is not threading.main_thread() else _TimedConnection
+        conn = sqlite3.connect(path, cached_statements=256, factory=factory, uri=path.startswith("file:"))
+        for pragma in DB_PRAGMAS: conn.execute(pragma)
+        # For migrations, merges and the shared store's triggers
+        conn.create_function("canonicalize_url", 1, canonicalize_url, deterministic=True)
+        conn.create_function("reddit_fullname", 1, reddit_fullname, deterministic=True)
+        profile = split_db_path(path)[1]
+        if profile is not None: open_shared_profile(conn, profile)
+        conn.generation, conns[path] = generation, conn
+    return conn
+
+def shared_store_path(profile_name):
+    """The DB path of a profile in the shared store: a URI naming SHARED_DB_FILE and the profile."""
+    return f"{SHARED_DB_FILE.as_uri()}?profile={quote(profile_name, safe='')}"
+
+def split_db_path(db_path):
+    """Returns (DB file, profile name) for a shared-store path, or (DB file, None) for a profile's own DB."""
+    path = str(db_path)
+    if not path.startswith("file:"): return Path(path), None
+    parsed = urlparse(path)
+    return Path(url2pathname(parsed.path)), parse_qs(parsed.query)['profile'][0]
+
+def close_db_connections(db_path=None):
+    """
+    Closes the calling thread's connections (to `db_path` only, if given), e.g. before the file is replaced.
+    Other threads cannot close theirs from here; they reopen them on their next db_connection call.
+    """
+    with _db_generations_lock:
+        key = None if db_path is None else str(db_path)
+        _db_generations[key] = _db_generations.get(key, 0) + 1
+    conns = _db_local.__dict__.get('conns', {})
+    for path in [p for p in conns if db_path is None or p == str(db_path)]:
+        conns.pop(path).close()
+
 # --- Database Functions ---
+# Subreddit and domain names live once in small dictionary tables; articles carry their integer ids
+ARTICLES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        url TEXT PRIMARY KEY, title TEXT NOT NULL,
+        subreddit_id INTEGER NOT NULL REFERENCES subreddits (id),
+        domain_id INTEGER NOT NULL REFERENCES domains (id),
+        permalink TEXT, created_utc REAL NOT NULL,
+        is_read INTEGER DEFAULT 0, is_bookmarked INTEGER DEFAULT 0,
+        is_new INTEGER DEFAULT 0, score INTEGER DEFAULT 0, num_comments INTEGER DEFAULT 0, canonical_url TEXT,
+        fullname TEXT, refreshed_utc REAL )'''
+# An article posted to several subreddits (or under several URLs for one story) is stored once, under the URL
+# and subreddit it was first seen with; this table records the other subreddits. `{table}` is the article table.
+ARTICLE_SUBREDDITS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS article_subreddits (
+        url TEXT NOT NULL, subreddit_id INTEGER NOT NULL REFERENCES subreddits (id),
+        PRIMARY KEY (url, subreddit_id) ) WITHOUT ROWID;
+    CREATE TRIGGER IF NOT EXISTS {table}_forget_subreddits AFTER DELETE ON {table} BEGIN
+        DELETE FROM article_subreddits WHERE url = OLD.url;
+    END'''
+RECORD_SUBREDDIT_SQL = '''
+    INSERT OR IGNORE INTO article_subreddits (url, subreddit_id)
+    SELECT a.url, s.id FROM {table} a JOIN subreddits s ON s.name = ? WHERE a.canonical_url = ? AND a.subreddit_id != s.id'''
+# Readers select from this view, which puts the names back under their old column names
+ARTICLE_VIEW_SQL = '''
+    CREATE VIEW IF NOT EXISTS article_view AS
+    SELECT a.rowid AS row_id, a.url, a.title, s.name AS subreddit, d.name AS source_domain, a.permalink,
+           a.created_utc, a.is_read, a.is_bookmarked, a.is_new, a.score, a.num_comments, a.subreddit_id, a.domain_id
+    FROM articles a JOIN subreddits s ON s.id = a.subreddit_id JOIN domains d ON d.id = a.domain_id'''
+INSERT_ARTICLE_SQL = '''
+    INSERT OR IGNORE INTO articles (url, title, subreddit_id, domain_id, permalink, created_utc,
+                                    is_read, is_bookmarked, is_new, score, num_comments, canonical_url, fullname)
+    VALUES (?, ?, (SELECT id FROM subreddits WHERE name = ?), (SELECT id FROM domains WHERE name = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
 def init_db(db_path):
-    with sqlite3.connect(db_path) as conn:
+    if split_db_path(db_path)[1] is not None: return init_shared_store()
+    with db_connection(db_path) as conn:
         cursor = conn.cursor()
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL") # Takes effect on a new file; compact_database converts older ones
         cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS articles (
-                url TEXT PRIMARY KEY, title TEXT NOT NULL, subreddit TEXT NOT NULL,
-                source_domain TEXT, permalink TEXT, created_utc REAL NOT NULL,
-                is_read INTEGER DEFAULT 0, is_bookmarked INTEGER DEFAULT 0,
-                is_new INTEGER DEFAULT 0, score INTEGER DEFAULT 0, num_comments INTEGER DEFAULT 0 ) ''')
-        cursor.execute("CREATE TABLE IF NOT EXISTS deleted_articles (url TEXT PRIMARY KEY)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS subreddits (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS domains (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, blocked INTEGER NOT NULL DEFAULT 0)")
         cursor.execute("PRAGMA table_info(articles)")
         columns = [c[1] for c in cursor.fetchall()]
-        if 'score' not in columns: cursor.execute("ALTER TABLE articles ADD COLUMN score INTEGER DEFAULT 0")
-        if 'num_comments' not in columns: cursor.execute("ALTER TABLE articles ADD COLUMN num_comments INTEGER DEFAULT 0")
+        if 'subreddit' in columns:
+            if 'score' not in columns: cursor.execute("ALTER TABLE articles ADD COLUMN score INTEGER DEFAULT 0")
+            if 'num_comments' not in columns: cursor.execute("ALTER TABLE articles ADD COLUMN num_comments INTEGER DEFAULT 0")
+            conn.commit()
+            migrate_to_dictionary_tables(conn)
+        cursor.execute(ARTICLES_SCHEMA.format(table='articles'))
+        cursor.execute("CREATE TABLE IF NOT EXISTS deleted_articles (url TEXT PRIMARY KEY, deleted_utc REAL)")
+        cursor.execute("PRAGMA table_info(deleted_articles)")
+        if 'deleted_utc' not in [c[1] for c in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE deleted_articles ADD COLUMN deleted_utc REAL")
+            cursor.execute("UPDATE deleted_articles SET deleted_utc = ?", (time.time(),)) # Expiry counts from the upgrade
+        # Backs keyset pagination on (created_utc, url) for the windowed list model
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_created_url ON articles (created_utc, url)")
+        # Partial indexes keep the Unseen, Bookmarks and Read views (and mark-all-as-seen) off the full table
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_new ON articles (created_utc, url) WHERE is_new = 1")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_bookmarked ON articles (created_utc, url) WHERE is_bookmarked = 1")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_read ON articles (created_utc, url) WHERE is_read = 1")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_domain_created ON articles (domain_id, created_utc, url)")
+        cursor.execute(ARTICLE_VIEW_SQL)
+        conn.executescript(ARTICLE_SUBREDDITS_SCHEMA.format(table='articles'))
+        migrate_to_canonical_urls(conn, 'articles')
+        add_engagement_columns(conn, 'articles')
+        init_clustering(conn, 'articles')
         conn.commit()
 
-def add_article_to_db(article, deleted_urls):
+def migrate_to_dictionary_tables(conn):
+    """Rewrites an articles table with text subreddit/domain columns onto the dictionary tables; compaction reclaims the space."""
+    conn.executescript(f'''
+        BEGIN;
+        INSERT OR IGNORE INTO subreddits (name) SELECT DISTINCT COALESCE(subreddit, '') FROM articles;
+        INSERT OR IGNORE INTO domains (name) SELECT DISTINCT COALESCE(source_domain, '') FROM articles;
+        DROP TABLE IF EXISTS articles_migrated;
+        {ARTICLES_SCHEMA.format(table='articles_migrated')};
+        INSERT INTO articles_migrated (rowid, url, title, subreddit_id, domain_id, permalink, created_utc,
+                                       is_read, is_bookmarked, is_new, score, num_comments)
+            SELECT a.rowid, a.url, a.title, s.id, d.id, a.permalink, a.created_utc,
+                   a.is_read, a.is_bookmarked, a.is_new, a.score, a.num_comments
+            FROM articles a
+            JOIN subreddits s ON s.name = COALESCE(a.subreddit, '')
+            JOIN domains d ON d.name = COALESCE(a.source_domain, '');
+        DROP VIEW IF EXISTS article_view;
+        DROP TABLE articles;
+        ALTER TABLE articles_migrated RENAME TO articles;
+        COMMIT;
+    ''')
+
+def migrate_to_canonical_urls(conn, table):
+    """
+    Fills canonical_url on `table` (articles, or the shared store's article_data) and merges the rows
+    that share one before the column gets its unique index: the first posted row is kept, with the
+    flags and counts combined as a backup merge does, and records the subreddits of the others.
+    The combined values are aggregated per group once, since canonical_url has no index yet.
+    Tombstones get the canonical form of their URL too. Does nothing once the index exists.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (f"idx_{table}_canonical",)).fetchone(): return
+    if 'canonical_url' not in {c[1] for c in conn.execute(f"PRAGMA table_info({table})")}:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN canonical_url TEXT")
+    if table == 'articles':
+        keep_first, merge_state = "created_utc, rowid", '''
+            CREATE TEMP TABLE canonical_merged (canonical_url TEXT PRIMARY KEY, is_read, is_bookmarked, is_new, score, num_comments);
+            INSERT INTO canonical_merged
+                SELECT g.canonical_url, max(d.is_read), max(d.is_bookmarked), min(d.is_new), max(d.score), max(d.num_comments)
+                FROM canonical_groups g JOIN articles d ON d.rowid = g.rid GROUP BY g.canonical_url;
+            UPDATE articles SET (is_read, is_bookmarked, is_new, score, num_comments) = (
+                SELECT is_read, is_bookmarked, is_new, score, num_comments FROM canonical_merged m WHERE m.canonical_url = articles.canonical_url)
+            WHERE rowid IN (SELECT rid FROM canonical_groups WHERE rank = 1);
+            INSERT OR IGNORE INTO deleted_articles (url, deleted_utc) SELECT canonicalize_url(url), deleted_utc FROM deleted_articles;'''
+    else: # Memberships of the merged rows move onto the kept row, combined per profile
+        keep_first, merge_state = "id", '''
+            CREATE TEMP TABLE canonical_merged (canonical_url TEXT PRIMARY KEY, score, num_comments);
+            INSERT INTO canonical_merged SELECT g.canonical_url, max(d.score), max(d.num_comments)
+                FROM canonical_groups g JOIN article_data d ON d.id = g.rid GROUP BY g.canonical_url;
+            UPDATE article_data SET (score, num_comments) = (
+                SELECT score, num_comments FROM canonical_merged m WHERE m.canonical_url = article_data.canonical_url)
+            WHERE id IN (SELECT rid FROM canonical_groups WHERE rank = 1);
+            INSERT INTO memberships (profile_id, article_id, created_utc, is_read, is_bookmarked, is_new)
+                SELECT m.profile_id, k.rid, m.created_utc, m.is_read, m.is_bookmarked, m.is_new
+                FROM memberships m JOIN canonical_groups g ON g.rid = m.article_id AND g.rank > 1
+                JOIN canonical_groups k ON k.canonical_url = g.canonical_url AND k.rank = 1 WHERE 1
+                ON CONFLICT (profile_id, article_id) DO UPDATE SET
+                    created_utc = min(created_utc, excluded.created_utc), is_read = max(is_read, excluded.is_read),
+                    is_bookmarked = max(is_bookmarked, excluded.is_bookmarked), is_new = min(is_new, excluded.is_new);
+            DELETE FROM memberships WHERE article_id IN (SELECT rid FROM canonical_groups WHERE rank > 1);
+            INSERT OR IGNORE INTO profile_tombstones (profile_id, url, deleted_utc)
+                SELECT profile_id, canonicalize_url(url), deleted_utc FROM profile_tombstones;'''
+    conn.executescript(f'''
+        BEGIN;
+        UPDATE {table} SET canonical_url = canonicalize_url(url) WHERE canonical_url IS NULL;
+        DROP TABLE IF EXISTS temp.canonical_groups;
+        DROP TABLE IF EXISTS temp.canonical_merged;
+        CREATE TEMP TABLE canonical_groups AS
+            SELECT rowid AS rid, url, canonical_url, subreddit_id,
+                   row_number() OVER (PARTITION BY canonical_url ORDER BY {keep_first}) AS rank
+            FROM {table} WHERE canonical_url IN (SELECT canonical_url FROM {table} GROUP BY canonical_url HAVING count(*) > 1);
+        CREATE INDEX temp.canonical_groups_rank ON canonical_groups (canonical_url, rank);
+        CREATE INDEX temp.canonical_groups_rid ON canonical_groups (rid);
+        {merge_state}
+        INSERT OR IGNORE INTO article_subreddits (url, subreddit_id)
+            SELECT k.url, g.subreddit_id FROM canonical_groups g
+            JOIN canonical_groups k ON k.canonical_url = g.canonical_url AND k.rank = 1
+            WHERE g.rank > 1 AND g.subreddit_id != k.subreddit_id;
+        DELETE FROM {table} WHERE rowid IN (SELECT rid FROM canonical_groups WHERE rank > 1);
+        DROP TABLE temp.canonical_groups;
+        DROP TABLE temp.canonical_merged;
+        CREATE UNIQUE INDEX idx_{table}_canonical ON {table} (canonical_url);
+        COMMIT;
+    ''')
+
+def add_engagement_columns(conn, table):
+    """Adds the fullname and refreshed_utc columns of `table` that the engagement refresher works from, taking fullnames from permalinks."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (f"idx_{table}_fullname",)).fetchone(): return
+    columns = {c[1] for c in conn.execute(f"PRAGMA table_info({table})")}
+    if 'fullname' not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN fullname TEXT")
+    if 'refreshed_utc' not in columns: conn.execute(f"ALTER TABLE {table} ADD COLUMN refreshed_utc REAL")
+    conn.executescript(f'''
+        BEGIN;
+        UPDATE {table} SET fullname = reddit_fullname(permalink) WHERE fullname IS NULL;
+        CREATE INDEX idx_{table}_fullname ON {table} (fullname);
+        COMMIT;
+    ''')
+
+def insert_articles(conn, rows):
+    """
+    Inserts (url, title, subreddit, domain, permalink, created_utc, is_read, is_bookmarked, is_new, score, num_comments)
+    rows; a row whose canonical URL is already stored only adds its subreddit to that article. Returns how many were new.
+    """
+    rows = [(url, title, subreddit or '', domain or '', *rest) for url, title, subreddit, domain, *rest in rows]
+    canonical, fullnames = [canonicalize_url(r[0]) for r in rows], [reddit_fullname(r[4]) for r in rows]
+    conn.executemany("INSERT OR IGNORE INTO subreddits (name) VALUES (?)", {(r[2],) for r in rows})
+    conn.executemany("INSERT OR IGNORE INTO domains (name) VALUES (?)", {(r[3],) for r in rows})
+    if getattr(conn, 'profile_id', None) is not None:
+        inserted, table = insert_shared_articles(conn, rows, canonical, fullnames), 'article_data'
+    else:
+        before, table = conn.total_changes, 'articles'
+        conn.executemany(INSERT_ARTICLE_SQL, [(*row, c, f) for row, c, f in zip(rows, canonical, fullnames)])
+        inserted = conn.total_changes - before
+    if inserted < len(rows): # Some were already stored
+        conn.executemany(RECORD_SUBREDDIT_SQL.format(table=table), [(row[2], c) for row, c in zip(rows, canonical)])
+    return inserted
+
+def sync_blocked_domains(db_path=None):
+    """Mirrors BLOCKED_DOMAINS onto the blocked flag of the domains table."""
+    with db_connection(db_path) as conn:
+        conn.executemany("INSERT OR IGNORE INTO domains (name) VALUES (?)", [(d,) for d in BLOCKED_DOMAINS])
+        conn.execute(f"UPDATE domains SET blocked = name IN ({','.join('?' for _ in BLOCKED_DOMAINS)})", tuple(BLOCKED_DOMAINS))
+        conn.commit()
+
+def add_article_to_db(article, deleted_urls, db_path=None):
     global HAS_NEW_ARTICLES
     url = article.get('url')
-    if not url or url in deleted_urls: return
+    if not url or url in deleted_urls or canonicalize_url(url) in deleted_urls: return
     domain = get_domain_from_url(url)
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        cursor.execute('INSERT OR IGNORE INTO articles (url, title, subreddit, source_domain, permalink, created_utc, score, num_comments, is_new) VALUES (?,?,?,?,?,?,?,?,?)', (
-            url, article.get('title'), article.get('subreddit'), domain,
-            article.get('permalink'), article.get('created_utc'), article.get('score', 0),
-            article.get('num_comments', 0), 1))
-        if cursor.rowcount > 0:
+    with db_connection(db_path) as conn:
+        # The shared store may hold it under another URL for another profile, which filed it in a story then
+        table = 'article_data' if conn.profile_id is not None else 'articles'
+        stored = conn.execute(f"SELECT 1 FROM {table} WHERE canonical_url = ?", (canonicalize_url(url),)).fetchone()
+        inserted = insert_articles(conn, [(url, article.get('title'), article.get('subreddit'), domain,
+                                           article.get('permalink'), article.get('created_utc'), 0, 0, 1,
+                                           article.get('score', 0), article.get('num_comments', 0))])
+        if inserted > 0:
+            if not stored: cluster_articles(conn, [(url, article.get('title'), article.get('created_utc'))])
             with data_lock: HAS_NEW_ARTICLES = True
         conn.commit()
 
-def get_articles_from_db():
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row
+def get_articles_from_db(db_path=None):
+    with db_connection(db_path) as conn:
         cursor = conn.cursor()
-        if not BLOCKED_DOMAINS:
-            cursor.execute("SELECT * FROM articles ORDER BY created_utc DESC")
-        else:
-            placeholders = ','.join('?' for _ in BLOCKED_DOMAINS)
-            cursor.execute(f"SELECT * FROM articles WHERE source_domain NOT IN ({placeholders}) ORDER BY created_utc DESC", tuple(BLOCKED_DOMAINS))
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(f"SELECT {ColumnarArticleStore.LOAD_COLUMNS} FROM article_view WHERE {BLOCKED_SQL} ORDER BY created_utc DESC")
         return [dict(row) for row in cursor.fetchall()]
 
-def update_article_status(url, is_read=None, is_bookmarked=None, is_new=None):
-    with sqlite3.connect(DB_FILE) as conn:
-        cursor = conn.cursor()
-        if is_read is not None: cursor.execute("UPDATE articles SET is_read = ? WHERE url = ?", (int(is_read), url))
-        if is_bookmarked is not None: cursor.execute("UPDATE articles SET is_bookmarked = ? WHERE url = ?", (int(is_bookmarked), url))
-        if is_new is not None: cursor.execute("UPDATE articles SET is_new = ? WHERE url = ?", (int(is_new), url))
-        conn.commit()
+def load_article_store(db_path=None):
+    """Streams every article into a ColumnarArticleStore, newest first."""
+    with db_connection(db_path) as conn:
+        conn.execute("BEGIN") # One snapshot for the rows and the rowid high-water mark
+        high_water = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM articles").fetchone()[0]
+        cursor = conn.execute(f"SELECT {ColumnarArticleStore.LOAD_COLUMNS} FROM article_view ORDER BY created_utc DESC, url DESC")
+        store = ColumnarArticleStore.from_cursor(cursor)
+        store.high_water_rowid = high_water
+        return store
+
+def merge_new_articles(store, db_path=None):
+    """Merges rows inserted since `store` was loaded into it, in sort order; returns how many."""
+    with db_connection(db_path) as conn:
+        conn.execute("BEGIN")
+        high_water = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM articles").fetchone()[0]
+        # rowid catches late arrivals older than our newest row; created_utc catches a reused max rowid
+        rows = conn.execute(f"SELECT {ColumnarArticleStore.LOAD_COLUMNS} FROM article_view WHERE row_id > ? OR created_utc > ?",
+                            (store.high_water_rowid, store.newest_created_utc())).fetchall()
+    store.high_water_rowid = high_water
+    return store.merge_rows(rows)
+
+def count_articles(where="", params=(), db_path=None):
+    """Counts straight off the articles table; view filters only use its columns, so no name joins are paid."""
+    with db_connection(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM articles {'WHERE ' + where if where else ''}", tuple(params)).fetchone()[0]
+
+# Filters test names against the dictionary tables once, then compare integer ids per article
+BLOCKED_SQL = "domain_id NOT IN (SELECT id FROM domains WHERE blocked = 1)"
+SEARCH_SQL = ("(instr(lower(title), ?) > 0"
+              " OR domain_id IN (SELECT id FROM domains WHERE instr(lower(name), ?) > 0)"
+              " OR subreddit_id IN (SELECT id FROM subreddits WHERE instr(lower(name), ?) > 0))")
+# Literal predicates (not bound parameters) so SQLite can match them to the partial indexes
+VIEW_MODE_SQL = {
+    "All": "",
+    "Unseen": "is_new = 1",
+    "Bookmarks": "is_bookmarked = 1",
+    "Read": "is_read = 1",
+    "Video": "+domain_id IN (SELECT id FROM domains WHERE name IN ('youtube.com', 'youtu.be', 'vimeo.com'))",
+    "Stories": "url NOT IN (SELECT c.url FROM article_clusters c JOIN articles s ON s.url = c.seed_url"
+               " WHERE c.seed_url IN (SELECT seed_url FROM lsh_buckets))",
+}
 
-def block_and_delete_article(url):
-    with sqlite3.connect(DB_FILE) as conn:
+def compile_view_query(mode, search=None, feed_filters=True):
+    """Returns (where, params) selecting the rows of a view mode, after feed filters and an optional search."""
+    clauses, params = [], []
+    if mode == "Highlights":
+        if HIGHLIGHT_KEYWORDS:
+            clauses.append(f"({' OR '.join('instr(lower(title), ?) > 0' for _ in HIGHLIGHT_KEYWORDS)})")
+            params.extend(sorted(HIGHLIGHT_KEYWORDS))
+        else: clauses.append("0")
+    elif VIEW_MODE_SQL.get(mode): clauses.append(VIEW_MODE_SQL[mode])
+    feed_where, feed_params = build_feed_filter() if feed_filters else ("", ())
+    if feed_where: clauses.append(feed_where); params.extend(feed_params)
+    if search: clauses.append(SEARCH_SQL); params.extend((search, search, search))
+    return ' AND '.join(clauses), tuple(params)
+
+def filter_store_view(store, mode, stories=None):
+    """The rows of an in-memory ColumnarArticleStore that view `mode` shows, after the feed filters; see load_stories."""
+    articles = store.view(exclude_domains=BLOCKED_DOMAINS, mute_keywords=MUTE_KEYWORDS)
+    if mode == "Bookmarks": return articles.where_flag(FLAG_BOOKMARKED)
+    if mode == "Highlights": return articles.where_title_contains_any(HIGHLIGHT_KEYWORDS)
+    if mode == "Unseen": return articles.where_flag(FLAG_NEW)
+    if mode == "Read": return articles.where_flag(FLAG_READ)
+    if mode == "Video": return articles.where_domain_in(VIDEO_DOMAINS)
+    if mode == "Stories":
+        return articles.where_url_not_in({url for urls in (load_stories() if stories is None else stories).values() for url in urls})
+    return articles
+
+def view_query_plans(conn, mode):
+    """{query: plan steps} for the first page, next page and count of view `mode`, as WindowedArticleList runs them."""
+    where, params = compile_view_query(mode)
+    scoped = f"WHERE {where} AND" if where else "WHERE"
+    queries = {
+        "first page": (f"SELECT * FROM article_view {'WHERE ' + where if where else ''} ORDER BY created_utc DESC, url DESC LIMIT 100", params),
+        "next page": (f"SELECT * FROM article_view {scoped} {WindowedArticleList.KEYSET_BELOW} ORDER BY created_utc DESC, url DESC LIMIT 100", params + (0, 0, '')),
+        "count": (f"SELECT COUNT(*) FROM articles {'WHERE ' + where if where else ''}", params),
+    }
+    return {name: [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", args)] for name, (sql, args) in queries.items()}
+
+def explain_view_queries(view_modes):
+    """Prints the plan of each view's first page, next page and count; False if any reads the whole table or sorts it."""
+    ok = True
+    with db_connection() as conn:
+        for mode in view_modes:
+            for name, plan in view_query_plans(conn, mode).items():
+                full_scan = any(step in ("SCAN articles", "SCAN a", "SCAN m") for step in plan) # Index scans read in order and stop at LIMIT
+                verdict = "FULL SCAN" if full_scan else "UNBOUNDED SORT" if "USE TEMP B-TREE FOR ORDER BY" in plan else "ok"
+                if verdict != "ok": ok = False
+                print(f"{mode:<11}{name:<12}{verdict:<16}{' | '.join(plan)}")
+    return ok
+
+def build_feed_filter():
+    """Returns (where, params) for the blocked-domain and mute-keyword filters; see sync_blocked_domains."""
+    clauses, params = [], []
+    if BLOCKED_DOMAINS:
+        clauses.append(BLOCKED_SQL)
+    for kw in sorted(MUTE_KEYWORDS):
+        clauses.append("instr(lower(title), ?) = 0")
+        params.append(kw)
+    return ' AND '.join(clauses), tuple(params)
+
+def block_and_delete_article(url, db_path=None):
+    with db_connection(db_path) as conn:
         cursor = conn.cursor()
-        cursor.execute("INSERT OR IGNORE INTO deleted_articles (url) VALUES (?)", (url,))
+        # The canonical form also keeps out the article's other URLs
+        cursor.executemany("INSERT OR IGNORE INTO deleted_articles (url, deleted_utc) VALUES (?, ?)",
+                           {(url, time.time()), (canonicalize_url(url), time.time())})
         cursor.execute("DELETE FROM articles WHERE url = ?", (url,))
         conn.commit()
 
-def mark_all_as_seen_in_db():
+def mark_all_as_seen_in_db(db_path=None):
     """Sets is_new to 0 for all new articles, leaving is_read untouched."""
-    with sqlite3.connect(DB_FILE) as conn:
+    with db_connection(db_path) as conn:
         cursor = conn.cursor()
+        # Counted up front: an UPDATE through the shared store's views reports no rowcount
+        rows_affected = cursor.execute("SELECT COUNT(*) FROM articles WHERE is_new = 1").fetchone()[0]
         # Only update the is_new column
         cursor.execute("UPDATE articles SET is_new = 0 WHERE is_new = 1")
-        rows_affected = cursor.rowcount
         conn.commit()
         return rows_affected
 
+class ArticleStateWriter:
+    """
+    Write-behind queue for the read/new/bookmark flags.
+
+    Changes are coalesced per URL in memory (the last value of each flag wins)
+    and written in one transaction per DB FLUSH_DELAY seconds after the first
+    unflushed change, or whenever flush() is called. Timed flushes all run on one
+    long-lived thread, so they reuse its db_connection. A batch is committed as a
+    whole or not at all; one that fails is put back under any newer changes.
+    """
+    FLUSH_DELAY = 0.5
+    UPDATE_SQL = ("UPDATE articles SET is_read = COALESCE(?, is_read), is_bookmarked = COALESCE(?, is_bookmarked), "
+                  "is_new = COALESCE(?, is_new) WHERE url = ?")
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock() # Keeps batches from reaching the DB out of order
+        self._wake = threading.Event()
+        self._thread = None
+        self.journal = None # When a list, every queued change is also appended to it as ((db_path, url), flags)
+
+    def queue(self, url, db_path=None, **flags):
+        """Records new values for is_read, is_bookmarked and/or is_new of `url` in `db_path` (the active profile's DB by default)."""
+        with self._lock:
+            key = (str(db_path or DB_FILE), url)
+            self._pending.setdefault(key, {}).update((k, int(v)) for k, v in flags.items())
+            if self.journal is not None: self.journal.append((key, flags))
+            self._schedule()
+
+    def _schedule(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop, name="state-writer", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.FLUSH_DELAY) # Changes queued meanwhile join this batch
+            self._wake.clear()
+            try: self.flush()
+            except sqlite3.Error: self._wake.set() # The batch was requeued; try again after the next delay
+
+    def pending(self):
+        with self._lock: return len(self._pending)
+
+    def flush(self):
+        """Writes every queued change in one transaction; returns how many articles were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch: return 0
+            by_db = {}
+            for (db_path, url), f in batch.items():
+                by_db.setdefault(db_path, []).append((f.get('is_read'), f.get('is_bookmarked'), f.get('is_new'), url))
+            try:
+                for db_path, rows in by_db.items():
+                    with db_connection(db_path) as conn: conn.executemany(self.UPDATE_SQL, rows)
+            except sqlite3.Error: # Re-applying the DBs that did commit is harmless
+                with self._lock:
+                    for key, flags in batch.items(): self._pending[key] = {**flags, **self._pending.get(key, {})}
+                raise
+            return len(batch)
+
+ARTICLE_STATE_WRITER = ArticleStateWriter()
+
+# --- Shared Article Store ---
+# With SharedArticleStore on, every profile lives in SHARED_DB_FILE: an article's text is stored once in article_data
+# and each profile that fetched it holds a membership row with its own read/new/bookmark flags. Connections opened on
+# shared_store_path(profile) get TEMP views named articles, deleted_articles and article_view, scoped to that profile
+# and writable through INSTEAD OF triggers, so the rest of the app runs the same SQL against either layout.
+SHARED_SCHEMA = f'''
+    PRAGMA auto_vacuum = INCREMENTAL;
+    PRAGMA journal_mode = WAL;
+    CREATE TABLE IF NOT EXISTS subreddits (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS domains (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, blocked INTEGER NOT NULL DEFAULT 0);
+    CREATE TABLE IF NOT EXISTS profiles (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS article_data (
+        id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, title TEXT NOT NULL,
+        subreddit_id INTEGER NOT NULL REFERENCES subreddits (id),
+        domain_id INTEGER NOT NULL REFERENCES domains (id),
+        permalink TEXT, score INTEGER DEFAULT 0, num_comments INTEGER DEFAULT 0, canonical_url TEXT,
+        fullname TEXT, refreshed_utc REAL );
+    CREATE TABLE IF NOT EXISTS memberships (
+        profile_id INTEGER NOT NULL REFERENCES profiles (id),
+        article_id INTEGER NOT NULL REFERENCES article_data (id),
+        created_utc REAL NOT NULL, is_read INTEGER DEFAULT 0, is_bookmarked INTEGER DEFAULT 0, is_new INTEGER DEFAULT 0,
+        PRIMARY KEY (profile_id, article_id) );
+    CREATE TABLE IF NOT EXISTS profile_tombstones (profile_id INTEGER NOT NULL, url TEXT NOT NULL, deleted_utc REAL, PRIMARY KEY (profile_id, url));
+    CREATE INDEX IF NOT EXISTS idx_memberships_article ON memberships (article_id);
+    CREATE INDEX IF NOT EXISTS idx_memberships_created ON memberships (profile_id, created_utc);
+    CREATE INDEX IF NOT EXISTS idx_memberships_new ON memberships (profile_id, created_utc) WHERE is_new = 1;
+    CREATE INDEX IF NOT EXISTS idx_memberships_bookmarked ON memberships (profile_id, created_utc) WHERE is_bookmarked = 1;
+    CREATE INDEX IF NOT EXISTS idx_memberships_read ON memberships (profile_id, created_utc) WHERE is_read = 1;
+    CREATE INDEX IF NOT EXISTS idx_article_data_domain ON article_data (domain_id);
+    {ARTICLE_SUBREDDITS_SCHEMA.format(table='article_data')};
+'''
+# created_utc is kept on the membership so each profile's timeline is read off its own index
+SHARED_ARTICLE_COLUMNS = ("m.rowid AS rowid, m.article_id, a.url, a.title, a.subreddit_id, a.domain_id, a.permalink, "
+                          "m.created_utc, m.is_read, m.is_bookmarked, m.is_new, a.score, a.num_comments, a.canonical_url, "
+                          "a.fullname, a.refreshed_utc")
+SHARED_PROFILE_VIEWS = '''
+    CREATE TEMP VIEW IF NOT EXISTS articles AS SELECT {columns}
+        FROM memberships m JOIN article_data a ON a.id = m.article_id WHERE m.profile_id = {profile_id};
+    CREATE TEMP TRIGGER IF NOT EXISTS articles_insert INSTEAD OF INSERT ON articles BEGIN
+        INSERT OR IGNORE INTO article_data (url, title, subreddit_id, domain_id, permalink, score, num_comments, canonical_url, fullname)
+            VALUES (NEW.url, NEW.title, NEW.subreddit_id, NEW.domain_id, NEW.permalink, COALESCE(NEW.score, 0), COALESCE(NEW.num_comments, 0),
+                    canonicalize_url(NEW.url), reddit_fullname(NEW.permalink));
+        INSERT OR IGNORE INTO memberships (profile_id, article_id, created_utc, is_read, is_bookmarked, is_new)
+            SELECT {profile_id}, id, NEW.created_utc, COALESCE(NEW.is_read, 0), COALESCE(NEW.is_bookmarked, 0), COALESCE(NEW.is_new, 0)
+            FROM article_data WHERE canonical_url = canonicalize_url(NEW.url);
+    END;
+    CREATE TEMP TRIGGER IF NOT EXISTS articles_update INSTEAD OF UPDATE ON articles BEGIN
+        UPDATE memberships SET is_read = NEW.is_read, is_bookmarked = NEW.is_bookmarked, is_new = NEW.is_new
+            WHERE profile_id = {profile_id} AND article_id = OLD.article_id;
+        UPDATE article_data SET score = NEW.score, num_comments = NEW.num_comments
+            WHERE id = OLD.article_id AND (score IS NOT NEW.score OR num_comments IS NOT NEW.num_comments);
+    END;
+    CREATE TEMP TRIGGER IF NOT EXISTS articles_delete INSTEAD OF DELETE ON articles BEGIN
+        DELETE FROM memberships WHERE profile_id = {profile_id} AND article_id = OLD.article_id;
+        DELETE FROM article_data WHERE id = OLD.article_id
+            AND NOT EXISTS (SELECT 1 FROM memberships WHERE article_id = OLD.article_id);
+    END;
+    CREATE TEMP VIEW IF NOT EXISTS deleted_articles AS
+        SELECT rowid AS rowid, url, deleted_utc FROM profile_tombstones WHERE profile_id = {profile_id};
+    CREATE TEMP TRIGGER IF NOT EXISTS deleted_articles_insert INSTEAD OF INSERT ON deleted_articles BEGIN
+        INSERT OR IGNORE INTO profile_tombstones (profile_id, url, deleted_utc) VALUES ({profile_id}, NEW.url, NEW.deleted_utc);
+    END;
+    CREATE TEMP TRIGGER IF NOT EXISTS deleted_articles_delete INSTEAD OF DELETE ON deleted_articles BEGIN
+        DELETE FROM profile_tombstones WHERE profile_id = {profile_id} AND url = OLD.url;
+    END;
+    {article_view};
+'''
+# insert_articles writes the two tables directly: it is the hot ingest path, and it counts only new memberships
+INSERT_SHARED_ARTICLE_SQL = '''
+    INSERT OR IGNORE INTO article_data (url, title, subreddit_id, domain_id, permalink, score, num_comments, canonical_url, fullname)
+    VALUES (?, ?, (SELECT id FROM subreddits WHERE name = ?), (SELECT id FROM domains WHERE name = ?), ?, ?, ?, ?, ?)'''
+INSERT_MEMBERSHIP_SQL = '''
+    INSERT OR IGNORE INTO memberships (profile_id, article_id, created_utc, is_read, is_bookmarked, is_new)
+    SELECT ?, id, ?, ?, ?, ? FROM article_data WHERE canonical_url = ?'''
+
+def open_shared_profile(conn, profile):
+    """Creates the shared schema if needed and scopes `conn` to `profile`."""
+    conn.executescript(SHARED_SCHEMA)
+    migrate_to_canonical_urls(conn, 'article_data')
+    add_engagement_columns(conn, 'article_data')
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO profiles (name) VALUES (?)", (profile,))
+        conn.profile_id = conn.execute("SELECT id FROM profiles WHERE name = ?", (profile,)).fetchone()[0]
+    conn.executescript(SHARED_PROFILE_VIEWS.format(columns=SHARED_ARTICLE_COLUMNS, profile_id=conn.profile_id,
+                                                   article_view=ARTICLE_VIEW_SQL.replace("CREATE VIEW", "CREATE TEMP VIEW")))
+
+def insert_shared_articles(conn, rows, canonical, fullnames):
+    """insert_articles for a connection scoped to a profile of the shared store; returns how many memberships were new."""
+    conn.executemany(INSERT_SHARED_ARTICLE_SQL, [(url, title, subreddit, domain, permalink, score, num_comments, c, f)
+                                                 for (url, title, subreddit, domain, permalink, _, _, _, _, score, num_comments), c, f
+                                                 in zip(rows, canonical, fullnames)])
+    before = conn.total_changes
+    conn.executemany(INSERT_MEMBERSHIP_SQL, [(conn.profile_id, created_utc, is_read, is_bookmarked, is_new, c)
+                                             for (_, _, _, _, _, created_utc, is_read, is_bookmarked, is_new, _, _), c in zip(rows, canonical)])
+    return conn.total_changes - before
+
+def init_shared_store():
+    """
+    Moves each profile DB still on disk into the shared store with merge_backup_into,
+    then sets the file aside in the backups folder as pre-shared-<name>.
+    """
+    with db_connection(SHARED_DB_FILE) as conn: # Upgrades the store itself, as init_db does a profile DB
+        conn.executescript(SHARED_SCHEMA)
+        migrate_to_canonical_urls(conn, 'article_data')
+        add_engagement_columns(conn, 'article_data')
+        init_clustering(conn, 'article_data')
+    config = CONFIG.config
+    for name in get_all_profiles():
+        db_filename = config.get(f"Profile:{name}", 'DatabaseFile', fallback=None)
+        legacy_path = CONFIG_DIR / db_filename if db_filename else None
+        if not legacy_path or not legacy_path.is_file(): continue
+        close_db_connections(legacy_path)
+        summary = merge_backup_into(shared_store_path(name), legacy_path, profile=name)
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("PRAGMA journal_mode=DELETE") # Checkpoints the WAL so the file moves as one piece
+        conn.close()
+        backups_dir = CONFIG_DIR / "backups"
+        backups_dir.mkdir(exist_ok=True)
+        os.replace(legacy_path, backups_dir / f"pre-shared-{legacy_path.name}")
+        print(f"Moved {summary['new articles']} articles of the '{name}' profile into the shared article store.")
+
+def remove_shared_profile(profile_name):
+    """Drops a profile's memberships and tombstones, and the articles no other profile holds."""
+    with db_connection(SHARED_DB_FILE) as conn:
+        row = conn.execute("SELECT id FROM profiles WHERE name = ?", (profile_name,)).fetchone()
+        if row is None: return
+        conn.execute("DELETE FROM memberships WHERE profile_id = ?", row)
+        conn.execute("DELETE FROM profile_tombstones WHERE profile_id = ?", row)
+        conn.execute("DELETE FROM profiles WHERE id = ?", row)
+        conn.execute("DELETE FROM article_data WHERE id NOT IN (SELECT article_id FROM memberships)")
+    close_db_connections(shared_store_path(profile_name))
+
+def rename_shared_profile(old_name, new_name):
+    with db_connection(SHARED_DB_FILE) as conn:
+        conn.execute("UPDATE profiles SET name = ? WHERE name = ?", (new_name, old_name))
+
+# --- Headline Clustering ---
+# A headline is reduced to its word set, and the set's MinHash signature is cut into LSH bands: headlines whose
+# word sets overlap a lot are likely to share a band. Each band value points at the first article of the story it
+# was seen in, so filing a new article costs a signature and a few lookups, however long the history is.
+CLUSTER_PERMUTATIONS = 32
+CLUSTER_BANDS = 16 # Of two rows each: headlines with a 0.4 word overlap share a band 94% of the time
+CLUSTER_MIN_SIMILARITY = 0.4 # Word-set Jaccard a headline needs with a story's first headline to join it
+CLUSTER_WINDOW_HOURS = 48 # Stories take new articles for this long after their latest one
+_MERSENNE_61 = (1 << 61) - 1
+_PRIME_63 = (1 << 63) - 25 # The largest prime that fits SQLite's signed 64-bit INTEGER
+MINHASH_COEFFICIENTS = [((i * 0x9E3779B97F4A7C15) % _MERSENNE_61 | 1, (i * 0xC2B2AE3D27D4EB4F) % _MERSENNE_61)
+                        for i in range(1, CLUSTER_PERMUTATIONS + 1)]
+TITLE_STOPWORDS = frozenset("a an the and or but of in on at to for from by with as is are was were be been has have had "
+                            "it its this that after over into about than will would could can not no up out".split())
+CLUSTER_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS lsh_buckets (
+        band INTEGER NOT NULL, band_key INTEGER NOT NULL, seed_url TEXT NOT NULL, created_utc REAL NOT NULL,
+        PRIMARY KEY (band, band_key) ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_lsh_buckets_created ON lsh_buckets (created_utc);
+    CREATE TABLE IF NOT EXISTS article_clusters (url TEXT PRIMARY KEY, seed_url TEXT NOT NULL) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_article_clusters_seed ON article_clusters (seed_url);
+    CREATE TRIGGER IF NOT EXISTS {table}_forget_cluster AFTER DELETE ON {table} BEGIN
+        DELETE FROM article_clusters WHERE url = OLD.url;
+    END'''
+FIND_STORIES_SQL = "SELECT seed_url FROM lsh_buckets WHERE band = ? AND band_key = ? AND created_utc >= ?"
+UPSERT_BUCKET_SQL = '''
+    INSERT INTO lsh_buckets (band, band_key, seed_url, created_utc) VALUES (?, ?, ?, ?)
+    ON CONFLICT (band, band_key) DO UPDATE SET created_utc = max(created_utc, excluded.created_utc)
+    WHERE seed_url = excluded.seed_url'''
+# An article is collapsed under the first article of its story while that one is still in the list and the story
+# still takes articles: cluster_articles prunes lsh_buckets to CLUSTER_WINDOW_HOURS, so older stories are not read
+STORY_MEMBERS_SQL = '''
+    SELECT c.seed_url, c.url FROM article_clusters c
+    WHERE c.seed_url IN (SELECT seed_url FROM lsh_buckets) AND EXISTS (SELECT 1 FROM articles s WHERE s.url = c.seed_url) AND EXISTS (SELECT 1 FROM articles f WHERE f.url = c.url)'''
+
+def title_tokens(title):
+    """The word set headlines are compared on: lowercased, without stopwords, possessives or plural s."""
+    words = re.findall(r"[a-z0-9]+(?:[.'][a-z0-9]+)*", re.sub(r"['’]s\b", "", (title or '').lower()))
+    return {w[:-1] if len(w) > 3 and w.endswith('s') and not w.endswith('ss') else w for w in words if w not in TITLE_STOPWORDS}
+
+def lsh_keys(tokens):
+    """The (band, band key) pairs of a word set's MinHash signature."""
+    hashes = [zlib.crc32(t.encode('utf-8')) for t in tokens] # Stable across runs, unlike hash() of a str
+    signature = [min((a * h + b) % _MERSENNE_61 for h in hashes) for a, b in MINHASH_COEFFICIENTS]
+    rows, keys = CLUSTER_PERMUTATIONS // CLUSTER_BANDS, []
+    for band in range(CLUSTER_BANDS):
+        key = 0
+        for value in signature[band * rows:(band + 1) * rows]: key = (key * _MERSENNE_61 + value) % _PRIME_63
+        keys.append((band, key)) # Computed from the signature alone, so stored keys match on any Python
+    return keys
+
+def cluster_articles(conn, rows, table=None):
+    """
+    Files each new (url, title, created_utc) row under the story whose first headline is the most
+    similar one its LSH buckets lead to, or opens a story with it. Returns how many joined a story.
+    `table` holds the titles: articles, or article_data in the shared store.
+    """
+    table = table or ('article_data' if getattr(conn, 'profile_id', None) is not None else 'articles')
+    window = CLUSTER_WINDOW_HOURS * 3600
+    conn.execute("DELETE FROM lsh_buckets WHERE created_utc < ?", (time.time() - window,))
+    joined = 0
+    for url, title, created_utc in rows:
+        tokens = title_tokens(title)
+        if not tokens: continue
+        created_utc, keys = created_utc or time.time(), lsh_keys(tokens)
+        candidates = {seed for band, key in keys for (seed,) in conn.execute(FIND_STORIES_SQL, (band, key, created_utc - window))}
+        seed, best = url, CLUSTER_MIN_SIMILARITY
+        for candidate in candidates - {url}:
+            row = conn.execute(f"SELECT title FROM {table} WHERE url = ?", (candidate,)).fetchone()
+            other = title_tokens(row[0]) if row else set()
+            similarity = len(tokens & other) / len(tokens | other)
+            if similarity >= best: seed, best = candidate, similarity
+        if seed != url:
+            conn.execute("INSERT OR IGNORE INTO article_clusters (url, seed_url) VALUES (?, ?)", (url, seed))
+            joined += 1
+        conn.executemany(UPSERT_BUCKET_SQL, [(band, key, seed, created_utc) for band, key in keys])
+    return joined
+
+def init_clustering(conn, table):
+    """
+    Creates the clustering tables for `table`; the first time, and when the buckets still hold keys from
+    Python's hash() (the bucket column), files the articles of the last CLUSTER_WINDOW_HOURS.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(lsh_buckets)")}
+    if 'bucket' in columns: conn.execute("DROP TABLE lsh_buckets") # Those keys depended on the interpreter
+    backfill = 'band_key' not in columns
+    conn.executescript(CLUSTER_SCHEMA.format(table=table))
+    if not backfill: return
+    if table == 'articles': sql = "SELECT url, title, created_utc FROM articles WHERE created_utc >= ? ORDER BY created_utc"
+    else: sql = '''SELECT a.url, a.title, min(m.created_utc) AS created FROM memberships m JOIN article_data a ON a.id = m.article_id
+                 WHERE m.created_utc >= ? GROUP BY a.id ORDER BY created'''
+    with conn: cluster_articles(conn, conn.execute(sql, (time.time() - CLUSTER_WINDOW_HOURS * 3600,)).fetchall(), table)
+
+def load_stories(db_path=None):
+    """{URL of a story's first article: [URLs collapsed under it]} of the stories still taking articles, for the Stories view."""
+    stories = {}
+    with db_connection(db_path) as conn:
+        for seed, url in conn.execute(STORY_MEMBERS_SQL): stories.setdefault(seed, []).append(url)
+    return stories
+
+# --- Retention & Compaction ---
+COMPACTION_INTERVAL_SECONDS = 6 * 3600
+COMPACTION_REPORT = None # Set by the background job for the UI to announce
+COMPACTION_STATUS = "" # Footer text while the background job rewrites the DB
+
+def compact_database(db_path=None, batch_size=500, pause=0.05, stop_event=None, status=None):
+    """
+    Applies the active profile's retention policy to `db_path` in batches of
+    `batch_size` rows, pausing between them so the fetcher and the UI get the
+    write lock, then hands the freed pages back with incremental vacuum.
+    Pruned articles are tombstoned like deleted ones, so the fetcher does not
+    bring them back before TOMBSTONE_DAYS. A DB created before incremental
+    vacuum is first rewritten once with VACUUM, announced through `status`.
+    Returns {'articles', 'tombstones', 'reclaimed_bytes'}.
+    """
+    conn = db_connection(db_path)
+    stopped = lambda: stop_event is not None and stop_event.is_set()
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2 and not stopped():
+        if status: status("🗜 Converting the database for compaction…")
+        try: conn.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;") # Blocks writers until done, so only ever run here
+        finally:
+            if status: status("")
+    def delete_in_batches(table, where, params=(), order="", budget=None, tombstone=False):
+        removed = 0
+        while not stopped():
+            limit = batch_size if budget is None else min(batch_size, budget - removed)
+            if limit <= 0: break
+            with conn: # Rowids are collected first: deletes through the shared store's views report no rowcount
+                rows = conn.execute(f"SELECT rowid, {'url, canonical_url' if tombstone else 'NULL, NULL'} FROM {table} WHERE {where} {order} LIMIT ?",
+                                    params + (limit,)).fetchall()
+                if tombstone:
+                    conn.executemany("INSERT OR IGNORE INTO deleted_articles (url, deleted_utc) VALUES (?, ?)",
+                                     {(url, time.time()) for _, *urls in rows for url in urls if url})
+                conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(rowid,) for rowid, _, _ in rows])
+            removed += len(rows)
+            if len(rows) < limit: break
+            time.sleep(pause)
+        return removed
+
+    keep = "is_bookmarked = 0" if RETENTION_KEEP_BOOKMARKS else "1"
+    report = {'articles': 0, 'tombstones': 0, 'reclaimed_bytes': 0}
+    if RETENTION_DAYS > 0:
+        report['articles'] += delete_in_batches("articles", f"created_utc < ? AND {keep}", (time.time() - RETENTION_DAYS * 86400,), tombstone=True)
+    if RETENTION_MAX_ARTICLES > 0:
+        excess = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] - RETENTION_MAX_ARTICLES
+        if excess > 0: report['articles'] += delete_in_batches("articles", keep, order="ORDER BY created_utc, url", budget=excess, tombstone=True)
+    if TOMBSTONE_DAYS > 0:
+        report['tombstones'] = delete_in_batches("deleted_articles", "deleted_utc < ?", (time.time() - TOMBSTONE_DAYS * 86400,))
+
+    page_size, pages_before = conn.execute("PRAGMA page_size").fetchone()[0], conn.execute("PRAGMA page_count").fetchone()[0]
+    while not stopped() and conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+        conn.executescript("PRAGMA incremental_vacuum(256);") # executescript steps it to completion; execute frees a single page
+        time.sleep(pause)
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    report['reclaimed_bytes'] = (pages_before - conn.execute("PRAGMA page_count").fetchone()[0]) * page_size
+    return report
+
+def format_compaction_report(report):
+    return (f"Compaction removed {report['articles']} articles and {report['tombstones']} tombstones, "
+            f"reclaimed {report['reclaimed_bytes'] / 2**20:.1f} MB.")
+
+def compaction_threaded():
+    """Runs compact_database at low priority shortly after startup and then every COMPACTION_INTERVAL_SECONDS."""
+    global COMPACTION_REPORT
+    if sys.platform.startswith('linux'):
+        try: os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10) # Linux niceness is per thread
+        except OSError: pass
+    def show(status):
+        global COMPACTION_STATUS
+        COMPACTION_STATUS = status
+        ARTICLES_UPDATED.set() # Wakes the UI for a redraw
+    if stop_thread_event.wait(60): return
+    while True:
+        try: report = compact_database(stop_event=stop_thread_event, status=show)
+        except sqlite3.Error: report = None
+        if report and any(report.values()):
+            with data_lock: COMPACTION_REPORT = report
+        if stop_thread_event.wait(COMPACTION_INTERVAL_SECONDS): return
+
 # --- Utility Functions ---
 def get_domain_from_url(url):
     if not url: return ""
@@ -469,6 +1289,45 @@ def get_domain_from_url(url):
         return netloc[4:] if netloc.startswith('www.') else netloc
     except Exception: return ""
 
+REDDIT_POST_ID_RE = re.compile(r'/comments/([a-z0-9]+)')
+
+def reddit_fullname(permalink):
+    """The t3_ fullname of the post behind a Reddit permalink, as /by_id/ takes it; None for other links."""
+    match = REDDIT_POST_ID_RE.search(permalink or '')
+    return f"t3_{match.group(1)}" if match else None
+
+# Query parameters that only say where a click came from; utm_* is matched by prefix
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', 'ref_src', 'ref_url',
+                   'cmpid', 'smid', 'smtyp', 'ocid', 'taid', 'guccounter', 'guce_referrer', 'guce_referrer_sig', 'amp', 'outputtype'}
+MOBILE_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+AMP_CACHE_PATH_RE = re.compile(r'^/(?:amp/|[cv]/)(s/)?(.+)$') # www.google.com/amp/s/<url>, <host>.cdn.ampproject.org/c/s/<url>
+
+def canonicalize_url(url):
+    """
+    The key an article is deduplicated on: https, the host lowercased without
+    www./m./amp. prefixes, AMP caches and /amp paths unwrapped, tracking
+    parameters and the fragment dropped, the rest of the query sorted, and no
+    trailing slash. URLs that are not http(s) come back unchanged.
+    """
+    try:
+        parsed = urlparse(url)
+        port = parsed.port
+    except ValueError: return url
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname: return url
+    host, path = parsed.hostname, parsed.path
+    if host.endswith('.cdn.ampproject.org') or (host.startswith(('google.', 'www.google.')) and path.startswith('/amp/')):
+        match = AMP_CACHE_PATH_RE.match(path)
+        if match: return canonicalize_url(f"https://{match.group(2)}" + (f"?{parsed.query}" if parsed.query else ""))
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix) and '.' in host[len(prefix):]: host = host[len(prefix):]
+    if port and port not in (80, 443): host = f"{host}:{port}"
+    segments = [s for s in path.split('/') if s and s.lower() != 'amp']
+    if segments and '.amp' in segments[-1].lower():
+        segments[-1] = re.sub(r'\.amp(?=\.html?$|$)', '', segments[-1], flags=re.IGNORECASE)
+    query = parsed.query and sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                                    if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS)
+    return f"https://{host}/{'/'.join(segments)}".rstrip('/') + (f"?{urlencode(query)}" if query else "")
+
 def format_time_ago(utc_timestamp):
     delta = time.time() - utc_timestamp
     if delta < 60: return f"{int(delta)}s ago"
@@ -476,27 +1335,990 @@ def format_time_ago(utc_timestamp):
     if delta < 86400: return f"{int(delta / 3600)}h ago"
     return f"{int(delta / 86400)}d ago"
 
+# --- Search ---
+def article_matches_query(article, q):
+    """True if the lowercased query appears in the title, domain or subreddit."""
+    return (q in article['title'].lower()
+            or q in (article.get('source_domain') or '').lower()
+            or q in (article.get('subreddit') or '').lower())
+
+class IncrementalSearch:
+    """
+    Evaluates search-as-you-type queries on a background worker.
+
+    Results are cached per query: extending a query only narrows the previous
+    result, and backspacing re-widens from the nearest cached ancestor instead
+    of rescanning the whole list. A newer submit cancels the running scan.
+    The worker ends once stop_thread_event is set.
+    """
+    DEBOUNCE_SECONDS = 0.06
+    CANCEL_CHECK_EVERY = 2000
+    MAX_CACHED_QUERIES = 32
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._generation = self._delivered = 0
+        self._pending = None
+        self._submitted_at = 0.0
+        self._base = None
+        self._cache = {}
+        self._result = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, base, query):
+        """Queues a query against `base`; a new base invalidates every cached result."""
+        with self._cond:
+            self._generation += 1
+            if base is not self._base: self._base, self._cache = base, {}
+            self._pending = (self._generation, query)
+            self._submitted_at = time.monotonic()
+            self._cond.notify()
+
+    def cancel(self):
+        """Drops any queued or running query and any unread result."""
+        with self._cond:
+            self._generation += 1
+            self._delivered = self._generation
+            self._pending, self._result = None, None
+
+    def take_result(self):
+        """Returns the result list for the latest submitted query once, or None."""
+        with self._cond:
+            if self._result is None or self._result[0] != self._generation: return None
+            items, self._result = self._result[1], None
+            return items
+
+    def is_busy(self):
+        """True while the latest query has not produced a result yet."""
+        with self._cond: return self._delivered != self._generation
+
+    def _source_for(self, query):
+        """Finds the cached result of the longest prefix of `query`."""
+        best_key = ""
+        for key in self._cache:
+            if len(key) > len(best_key) and query.startswith(key): best_key = key
+        return best_key, self._cache.get(best_key, self._base)
+
+    def _remember(self, base, query, items):
+        with self._cond:
+            if base is not self._base: return
+            if len(self._cache) >= self.MAX_CACHED_QUERIES:
+                self._cache = {k: v for k, v in self._cache.items() if query.startswith(k)}
+            self._cache[query] = items
+
+    def _run(self):
+        while not stop_thread_event.is_set():
+            with self._cond:
+                if self._pending is None:
+                    self._cond.wait(1) # Wakes now and then to notice stop_thread_event
+                    continue
+                # Debounce: let a burst of keystrokes settle before scanning.
+                remaining = self._submitted_at + self.DEBOUNCE_SECONDS - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                generation, query = self._pending
+                self._pending = None
+                base = self._base
+                if query in self._cache: items = self._cache[query]
+                elif not query: items = base
+                else: items = None
+                if items is None: _, source = self._source_for(query)
+
+            if items is None and hasattr(base, 'search'):
+                # Windowed lists search in SQL rather than being scanned row by row
+                try: items = base.search(query)
+                except sqlite3.Error: items = []
+                self._remember(base, query, items)
+            elif items is None:
+                is_stale = lambda: generation != self._generation
+                if hasattr(source, 'matching'): items = source.matching(query, is_stale)
+                else:
+                    items = []
+                    for i, article in enumerate(source):
+                        if i % self.CANCEL_CHECK_EVERY == 0 and is_stale(): items = None; break
+                        if article_matches_query(article, query): items.append(article)
+                if items is not None: self._remember(base, query, items)
+                if generation != self._generation: continue
+
+            with self._cond:
+                if generation == self._generation: self._result, self._delivered = (generation, items), generation
+
+# --- Windowed List Model ---
+class WindowedArticleList:
+    """
+    A read-only sequence of article dicts, newest first, that keeps only the
+    pages around the viewport in memory.
+
+    Pages are read with keyset pagination on (created_utc, url): a page is
+    fetched relative to the last key of the page above it (or the first key of
+    the page below), so scrolling never pays for an OFFSET scan. Random jumps
+    fall back to one OFFSET query, or read the tail in ascending order, and
+    continue with keysets from there. Neighbouring pages are prefetched by one
+    worker thread shared by all windows. Rows removed after the count was taken
+    make a page come back short; the window then recounts and reads it again.
+    """
+    PAGE_SIZE = 100
+    MAX_PAGES = 8
+    _prefetch_pool, _prefetch_pool_lock = None, threading.Lock()
+    # Keysets written as a range on created_utc plus a tie-break, so SQLite seeks instead of scanning from the top
+    KEYSET_BELOW = "created_utc <= ? AND (created_utc < ? OR url < ?)"
+    KEYSET_ABOVE = "created_utc >= ? AND (created_utc > ? OR url > ?)"
+
+    def __init__(self, where="", params=()):
+        self.where, self.params = where, tuple(params)
+        self._pages = OrderedDict()
+        self._prefetching = set()
+        self._lock = threading.Lock()
+        self._count = None
+        self._generation = 0 # Bumped when cached pages are dropped, so stale prefetches are discarded
+
+    def __len__(self):
+        if self._count is None: self._count = count_articles(self.where, self.params)
+        return self._count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("article index out of range")
+        page_no, offset = divmod(index, self.PAGE_SIZE)
+        page = self._get_page(page_no)
+        if offset >= len(page): # Rows were deleted, blocked or compacted since the count
+            self._invalidate()
+            if index >= len(self): raise IndexError("article index out of range")
+            page = self._get_page(page_no)
+            if offset >= len(page): raise IndexError("article index out of range")
+        return page[offset]
+
+    def __iter__(self):
+        for i in range(len(self)): yield self[i]
+
+    def index_of(self, article):
+        """Position of `article` in this window, counted with the (created_utc, url) index."""
+        if not count_articles(f"{self.where + ' AND ' if self.where else ''}url = ?", self.params + (article['url'],)): return None
+        where = f"{self.where} AND {self.KEYSET_ABOVE}" if self.where else self.KEYSET_ABOVE
+        return count_articles(where, self.params + (article['created_utc'], article['created_utc'], article['url']))
+
+    def search(self, query):
+        """Returns a new window narrowed to `query`, with its count and first page loaded."""
+        where = f"{self.where} AND {SEARCH_SQL}" if self.where else SEARCH_SQL
+        narrowed = WindowedArticleList(where, self.params + (query, query, query))
+        if narrowed: narrowed._get_page(0)
+        return narrowed
+
+    def _invalidate(self):
+        with self._lock:
+            self._pages.clear()
+            self._count = None
+            self._generation += 1
+
+    def _get_page(self, page_no):
+        with self._lock:
+            page = self._pages.get(page_no)
+            if page is not None: self._pages.move_to_end(page_no)
+            generation = self._generation
+        if page is None:
+            page = self._load_page(page_no)
+            self._store_page(page_no, page, generation)
+        for neighbour in (page_no - 1, page_no + 1):
+            if 0 <= neighbour * self.PAGE_SIZE < len(self): self._prefetch(neighbour)
+        return page
+
+    def _store_page(self, page_no, page, generation):
+        with self._lock:
+            if generation != self._generation: return
+            self._pages[page_no] = page
+            self._pages.move_to_end(page_no)
+            while len(self._pages) > self.MAX_PAGES: self._pages.popitem(last=False)
+
+    def _prefetch(self, page_no):
+        with self._lock:
+            if page_no in self._pages or page_no in self._prefetching: return
+            self._prefetching.add(page_no)
+            generation = self._generation
+        def worker():
+            try: self._store_page(page_no, self._load_page(page_no), generation)
+            except sqlite3.Error: pass
+            finally:
+                with self._lock: self._prefetching.discard(page_no)
+        with WindowedArticleList._prefetch_pool_lock:
+            if WindowedArticleList._prefetch_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                WindowedArticleList._prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        WindowedArticleList._prefetch_pool.submit(worker)
+
+    def _query(self, keyset, keyset_params, order, limit, offset=0):
+        clauses = [c for c in (self.where, keyset) if c]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(f"SELECT {ColumnarArticleStore.LOAD_COLUMNS} FROM article_view {where} ORDER BY created_utc {order}, url {order} LIMIT ? OFFSET ?",
+                           self.params + keyset_params + (limit, offset))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _load_page(self, page_no):
+        start = page_no * self.PAGE_SIZE
+        limit = min(self.PAGE_SIZE, len(self) - start)
+        if limit <= 0: return []
+        with self._lock:
+            above, below = self._pages.get(page_no - 1), self._pages.get(page_no + 1)
+        if above:
+            key = above[-1]
+            return self._query(self.KEYSET_BELOW, (key['created_utc'], key['created_utc'], key['url']), "DESC", limit)
+        if below:
+            key = below[0]
+            return self._query(self.KEYSET_ABOVE, (key['created_utc'], key['created_utc'], key['url']), "ASC", limit)[::-1]
+        if start + limit >= len(self): return self._query("", (), "ASC", limit)[::-1]
+        return self._query("", (), "DESC", limit, start)
+
+# --- Cross-Profile Timeline ---
+_upgraded_databases = set()
+
+def get_profile_databases():
+    """Returns {profile name: DB path} for every profile whose DB file exists, upgrading each schema once."""
+    config = CONFIG.config
+    databases = {}
+    for name in get_all_profiles():
+        db_filename = config.get(f"Profile:{name}", 'DatabaseFile', fallback=None)
+        if SHARED_ARTICLE_STORE: path = shared_store_path(name)
+        elif not db_filename or not (CONFIG_DIR / db_filename).is_file(): continue
+        else: path = CONFIG_DIR / db_filename
+        databases[name] = path
+        if path not in _upgraded_databases: # Profiles not opened since an upgrade still need init_db's migrations
+            init_db(path)
+            _upgraded_databases.add(path)
+    return databases
+
+class CrossProfileTimeline:
+    """
+    A read-only sequence over the articles of every profile, newest first.
+
+    Each profile DB (or the shared store, once) is ATTACHed to one connection and
+    each profile is read in (created_utc, url) order, a keyset page of BATCH_SIZE
+    rows at a time so no read transaction stays open between pages; heapq.merge
+    interleaves the streams lazily, so rows are only read as far as the viewport
+    has reached. Past SQLite's limit on attached databases (10 by default), the
+    remaining profiles are attached to further connections. A URL held by several
+    profiles appears once, tagged with the profile that has its newest copy.
+    close() releases the connections once the view is replaced.
+    """
+    BATCH_SIZE = 200
+    KEYSET_BELOW = "a.created_utc <= ? AND (a.created_utc < ? OR a.url < ?)"
+
+    def __init__(self, databases=None, search=None):
+        self.databases = get_profile_databases() if databases is None else databases
+        self.search_query = search
+        # Built on the search worker and read on the UI thread, never at the same time
+        self._conns = []
+        self.sources, attached = [], {}
+        for profile, path in self.databases.items():
+            db_file, scope = split_db_path(path)
+            if db_file not in attached:
+                conn, schema = self._conns[-1] if self._conns else self._connect(), f"p{len(attached)}"
+                try: conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(db_file),))
+                except sqlite3.OperationalError: # Past the attach limit; start the next batch of profiles
+                    conn = self._connect()
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(db_file),))
+                attached[db_file] = (conn, schema)
+            conn, schema = attached[db_file]
+            if scope is None: relation = f"{schema}.articles"
+            else: # A profile of the shared store, read through the same columns as its TEMP articles view
+                row = conn.execute(f"SELECT id FROM {schema}.profiles WHERE name = ?", (scope,)).fetchone()
+                if row is None: continue
+                relation = (f"(SELECT {SHARED_ARTICLE_COLUMNS} FROM {schema}.memberships m "
+                            f"JOIN {schema}.article_data a ON a.id = m.article_id WHERE m.profile_id = {row[0]})")
+            self.sources.append((profile, str(path), relation, schema, conn))
+        self._items, self._seen = [], set()
+        self._merged = heapq.merge(*(self._stream(source) for source in self.sources),
+                                   key=lambda item: (item['created_utc'], item['url']), reverse=True)
+        self._count = None
+
+    def _connect(self):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        self._conns.append(conn)
+        return conn
+
+    def close(self):
+        for conn in self._conns: conn.close()
+
+    def _from_where(self, source, keyset=()):
+        _, _, relation, schema, _ = source
+        clauses, params = [self.KEYSET_BELOW] if keyset else [], list(keyset)
+        if BLOCKED_DOMAINS:
+            clauses.append(f"d.name NOT IN ({','.join('?' for _ in BLOCKED_DOMAINS)})")
+            params.extend(sorted(BLOCKED_DOMAINS))
+        for kw in sorted(MUTE_KEYWORDS):
+            clauses.append("instr(lower(a.title), ?) = 0")
+            params.append(kw)
+        if self.search_query:
+            clauses.append("(instr(lower(a.title), ?) > 0 OR instr(lower(d.name), ?) > 0 OR instr(lower(s.name), ?) > 0)")
+            params.extend((self.search_query,) * 3)
+        return (f"FROM {relation} a JOIN {schema}.subreddits s ON s.id = a.subreddit_id "
+                f"JOIN {schema}.domains d ON d.id = a.domain_id {'WHERE ' + ' AND '.join(clauses) if clauses else ''}"), params
+
+    def _stream(self, source):
+        profile, db_path, _, _, conn = source
+        keyset = ()
+        while True:
+            from_where, params = self._from_where(source, keyset)
+            rows = conn.execute(f"SELECT a.url, a.title, s.name, d.name, a.permalink, a.created_utc, a.is_read, a.is_bookmarked, "
+                                f"a.is_new, a.score, a.num_comments {from_where} ORDER BY a.created_utc DESC, a.url DESC LIMIT ?",
+                                params + [self.BATCH_SIZE]).fetchall()
+            for row in rows:
+                item = dict(zip(ColumnarArticleStore.FIELDS, row))
+                item['profile'], item['db_path'] = profile, db_path
+                yield item
+            if len(rows) < self.BATCH_SIZE: return
+            keyset = (rows[-1][5], rows[-1][5], rows[-1][0])
+
+    def __len__(self):
+        if self._count is None:
+            by_conn = {}
+            for source in self.sources: by_conn.setdefault(source[4], []).append(self._from_where(source))
+            unions = {conn: (" UNION ".join(f"SELECT a.url {from_where}" for from_where, _ in parts), [p for _, params in parts for p in params])
+                      for conn, parts in by_conn.items()}
+            if len(unions) <= 1:
+                self._count = sum(conn.execute(f"SELECT COUNT(*) FROM ({union})", params).fetchone()[0] for conn, (union, params) in unions.items())
+            else: # URLs can repeat across connections, so they are deduplicated here
+                self._count = len({url for conn, (union, params) in unions.items() for (url,) in conn.execute(union, params)})
+        return self._count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        while len(self._items) <= index:
+            item = next(self._merged, None)
+            if item is None: raise IndexError("article index out of range")
+            if item['url'] in self._seen: continue
+            self._seen.add(item['url'])
+            self._items.append(item)
+        return self._items[index]
+
+    def __iter__(self):
+        for i in range(len(self)): yield self[i]
+
+    def search(self, query):
+        """Returns a new timeline narrowed to `query`, with its first rows merged."""
+        narrowed = CrossProfileTimeline(self.databases, query)
+        if narrowed: narrowed[0]
+        return narrowed
+
+# --- Columnar Article Store ---
+FLAG_READ, FLAG_NEW, FLAG_BOOKMARKED = 1, 2, 4
+FLAG_FIELDS = {'is_read': FLAG_READ, 'is_new': FLAG_NEW, 'is_bookmarked': FLAG_BOOKMARKED}
+VIDEO_DOMAINS = ('youtube.com', 'youtu.be', 'vimeo.com')
+
+class _TextColumn:
+    """Strings packed into one UTF-8 buffer; row r spans offsets[r]:offsets[r + 1]."""
+    def __init__(self):
+        self.buffer, self.offsets = bytearray(), array('Q', [0])
+
+    def append(self, text):
+        self.buffer += (text or '').encode('utf-8')
+        self.offsets.append(len(self.buffer))
+
+    def __getitem__(self, row):
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def raw(self, row):
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]]
+
+    def nbytes(self):
+        return len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+class _InternTable:
+    """Maps repeated strings to small integer ids."""
+    def __init__(self):
+        self.names, self.ids = [], {}
+
+    def intern(self, name):
+        name = name or ''
+        ident = self.ids.get(name)
+        if ident is None:
+            ident = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return ident
+
+    def ids_matching(self, predicate):
+        return {ident for ident, name in enumerate(self.names) if predicate(name)}
+
+class ArticleRef:
+    """A dict-like handle on one row of a ColumnarArticleStore."""
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store, self.row = store, row
+
+    def __getitem__(self, key):
+        return self.store.field(self.row, key)
+
+    def __setitem__(self, key, value):
+        self.store.set_field(self.row, key, value)
+
+    def __eq__(self, other):
+        return isinstance(other, ArticleRef) and other.store is self.store and other.row == self.row
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    def get(self, key, default=None):
+        try: return self.store.field(self.row, key)
+        except KeyError: return default
+
+    def keys(self):
+        return ColumnarArticleStore.FIELDS
+
+class ArticleView:
+    """An ordered subset of a store's rows, exposed as a sequence of ArticleRefs."""
+    def __init__(self, store, rows):
+        self.store, self.rows = store, rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return ArticleView(self.store, self.rows[index])
+        return ArticleRef(self.store, self.rows[index])
+
+    def __iter__(self):
+        store = self.store
+        for row in self.rows: yield ArticleRef(store, row)
+
+    def index_of(self, article):
+        """Position of `article` in this view, or None."""
+        if not isinstance(article, ArticleRef) or article.store is not self.store: return None
+        try: return self.rows.index(article.row)
+        except ValueError: return None
+
+    def _where(self, predicate):
+        return ArticleView(self.store, array('I', filter(predicate, self.rows)))
+
+    def where_flag(self, flag):
+        flags = self.store.flags
+        return self._where(lambda r: flags[r] & flag)
+
+    def where_domain_in(self, domains):
+        wanted, domain_ids = self.store.domains.ids_matching(lambda d: d in domains), self.store.domain_ids
+        return self._where(lambda r: domain_ids[r] in wanted)
+
+    def where_title_contains_any(self, keywords):
+        titles = self.store.titles
+        return self._where(lambda r: any(kw in titles[r].lower() for kw in keywords))
+
+    def where_url_not_in(self, urls):
+        if not urls: return self
+        text = self.store.urls
+        return self._where(lambda r: text[r] not in urls)
+
+    def matching(self, query, is_stale=None):
+        """Rows whose title, domain or subreddit contains `query`; None if `is_stale()` turns true."""
+        store = self.store
+        subs = store.subreddits.ids_matching(lambda n: query in n.lower())
+        domains = store.domains.ids_matching(lambda n: query in n.lower())
+        sub_ids, domain_ids, titles = store.subreddit_ids, store.domain_ids, store.titles
+        found = array('I')
+        for i, r in enumerate(self.rows):
+            if is_stale and i % IncrementalSearch.CANCEL_CHECK_EVERY == 0 and is_stale(): return None
+            if sub_ids[r] in subs or domain_ids[r] in domains or query in titles[r].lower(): found.append(r)
+        return ArticleView(store, found)
+
+class ColumnarArticleStore:
+    """
+    Articles held column-wise instead of as one dict per row.
+
+    Numeric fields live in typed arrays, the read/new/bookmarked state is packed
+    into one flag byte per row, subreddit and domain names are interned, and
+    URL, title and permalink text sit in contiguous UTF-8 buffers addressed by
+    offset. Row ids never change; `order` lists the live rows newest first.
+    """
+    FIELDS = ('url', 'title', 'subreddit', 'source_domain', 'permalink', 'created_utc',
+              'is_read', 'is_bookmarked', 'is_new', 'score', 'num_comments')
+    LOAD_COLUMNS = ', '.join(FIELDS)
+
+    def __init__(self):
+        self.urls, self.titles, self.permalinks = _TextColumn(), _TextColumn(), _TextColumn()
+        self.subreddits, self.domains = _InternTable(), _InternTable()
+        self.subreddit_ids, self.domain_ids = array('I'), array('I')
+        self.created_utc, self.scores, self.num_comments = array('d'), array('i'), array('i')
+        self.flags = array('B')
+        self.order = array('I')
+        self.high_water_rowid = 0
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size=5000):
+        """Builds a store from rows in LOAD_COLUMNS order, already sorted newest first."""
+        store = cls()
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch: break
+            for row in batch: store.order.append(store.append_row(row))
+        return store
+
+    def append_row(self, row):
+        """Appends a LOAD_COLUMNS tuple to the columns and returns its row id (not added to `order`)."""
+        url, title, subreddit, domain, permalink, created_utc, is_read, is_bookmarked, is_new, score, num_comments = row
+        self.urls.append(url); self.titles.append(title); self.permalinks.append(permalink)
+        self.subreddit_ids.append(self.subreddits.intern(subreddit))
+        self.domain_ids.append(self.domains.intern(domain))
+        self.created_utc.append(created_utc or 0)
+        self.scores.append(score or 0); self.num_comments.append(num_comments or 0)
+        self.flags.append((FLAG_READ if is_read else 0) | (FLAG_NEW if is_new else 0) | (FLAG_BOOKMARKED if is_bookmarked else 0))
+        return len(self.flags) - 1
+
+    def merge_rows(self, rows):
+        """Inserts LOAD_COLUMNS tuples into `order` at their sorted positions; returns how many."""
+        created, urls = self.created_utc, self.urls
+        for row in rows:
+            new_row = self.append_row(row)
+            key = (created[new_row], urls.raw(new_row))
+            lo, hi = 0, len(self.order)
+            while lo < hi: # Binary search on (created_utc, url), descending
+                mid = (lo + hi) // 2
+                other = self.order[mid]
+                if (created[other], urls.raw(other)) > key: lo = mid + 1
+                else: hi = mid
+            self.order.insert(lo, new_row)
+        return len(rows)
+
+    def newest_created_utc(self):
+        return self.created_utc[self.order[0]] if self.order else 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return ArticleView(self, self.order[index])
+        return ArticleRef(self, self.order[index])
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def view(self, exclude_domains=(), mute_keywords=()):
+        """All live rows, minus blocked domains and titles containing a mute keyword."""
+        view = ArticleView(self, array('I', self.order)) # A snapshot, so merges never shift a live view
+        if exclude_domains:
+            blocked, domain_ids = self.domains.ids_matching(lambda d: d in exclude_domains), self.domain_ids
+            if blocked: view = view._where(lambda r: domain_ids[r] not in blocked)
+        if mute_keywords:
+            titles = self.titles
+            view = view._where(lambda r: not any(kw in titles[r].lower() for kw in mute_keywords))
+        return view
+
+    def field(self, row, key):
+        if key in FLAG_FIELDS: return bool(self.flags[row] & FLAG_FIELDS[key])
+        if key == 'title': return self.titles[row]
+        if key == 'url': return self.urls[row]
+        if key == 'subreddit': return self.subreddits.names[self.subreddit_ids[row]]
+        if key == 'source_domain': return self.domains.names[self.domain_ids[row]]
+        if key == 'permalink': return self.permalinks[row]
+        if key == 'created_utc': return self.created_utc[row]
+        if key == 'score': return self.scores[row]
+        if key == 'num_comments': return self.num_comments[row]
+        raise KeyError(key)
+
+    def set_field(self, row, key, value):
+        if key in FLAG_FIELDS:
+            if value: self.flags[row] |= FLAG_FIELDS[key]
+            else: self.flags[row] &= ~FLAG_FIELDS[key] & 0xFF
+        elif key == 'score': self.scores[row] = value
+        elif key == 'num_comments': self.num_comments[row] = value
+        else: raise KeyError(f"'{key}' is read-only in the columnar store")
+
+    def clear_flag(self, flag):
+        """Clears `flag` on every row in one pass over the flag bytes."""
+        table = bytes(b & ~flag & 0xFF for b in range(256))
+        self.flags = array('B', self.flags.tobytes().translate(table))
+
+    def position_of_url(self, url):
+        """Index in `order` of the live row for `url`, or None; a linear scan over the raw URL bytes."""
+        target = url.encode('utf-8')
+        offsets, urls = self.urls.offsets, self.urls
+        for i, r in enumerate(self.order):
+            if offsets[r + 1] - offsets[r] == len(target) and urls.raw(r) == target: return i
+        return None
+
+    def discard(self, url):
+        """Drops the row for `url` from `order`; its column data stays until the next reload."""
+        i = self.position_of_url(url)
+        if i is None: return False
+        del self.order[i]
+        return True
+
+    def set_flags(self, url, flags):
+        """Applies {field: value} flag changes, as queued to ArticleStateWriter, to the row for `url`."""
+        i = self.position_of_url(url)
+        if i is None: return
+        for key, value in flags.items(): self.set_field(self.order[i], key, value)
+
+    def nbytes(self):
+        """Approximate memory held by the columns and intern tables."""
+        arrays = (self.subreddit_ids, self.domain_ids, self.created_utc, self.scores, self.num_comments, self.flags, self.order)
+        interned = sum(sys.getsizeof(n) for n in self.subreddits.names + self.domains.names)
+        return (sum(a.itemsize * len(a) for a in arrays) + interned
+                + self.urls.nbytes() + self.titles.nbytes() + self.permalinks.nbytes())
+
+class PendingArticleStore(ColumnarArticleStore):
+    """
+    Stands in, empty, for a store that is still loading. Discards and flag
+    clears made to it are recorded, then replayed onto the loaded store, since
+    they may have reached the DB after the load's snapshot was taken.
+    """
+    def __init__(self):
+        super().__init__()
+        self.edits = []
+
+    def clear_flag(self, flag):
+        self.edits.append(('clear_flag', flag))
+
+    def discard(self, url):
+        self.edits.append(('discard', url))
+        return False
+
+    def replay(self, store):
+        for name, arg in self.edits: getattr(store, name)(arg)
+
 # --- Comment Data Structure ---
 class CommentNode:
     def __init__(self, data, depth=0):
         self.author, self.score, self.body, self.depth = data.get('author','[d]'), data.get('score',0), data.get('body',''), depth
         self.children, self.is_collapsed = [], False
 
+# --- Startup Trace ---
+STARTUP_PHASES = None # With --startup-trace, a list of (phase, perf_counter) marks since STARTUP_STARTED
+
+def trace_startup(phase):
+    if STARTUP_PHASES is not None: STARTUP_PHASES.append((phase, time.perf_counter()))
+
+def format_startup_trace():
+    """One line per phase: its own time and the total since the process started."""
+    lines, previous = [f"{'Phase':<20}{'Took':>10}{'Total':>11}"], STARTUP_STARTED
+    for phase, at in STARTUP_PHASES:
+        lines.append(f"{phase:<20}{(at - previous) * 1000:8.1f} ms{(at - STARTUP_STARTED) * 1000:8.1f} ms")
+        previous = at
+    return '\n'.join(lines)
+
+# --- UI Latency Stats ---
+class UILatencyStats:
+    """
+    Rolling timings of the UI loop, in milliseconds, kept per phase over the
+    last WINDOW samples: key handling ('input'), view regeneration ('regen'),
+    drawing a frame ('draw'), the part of it spent writing to the terminal
+    ('flush'), statements run on the UI thread ('db') and keypress to finished
+    frame ('latency').
+    With a trace file set, every sample is also written to it as a JSON line.
+    """
+    WINDOW = 500
+    PHASES = ('latency', 'input', 'regen', 'draw', 'flush', 'db')
+
+    def __init__(self):
+        self.samples = {phase: deque(maxlen=self.WINDOW) for phase in self.PHASES}
+        self.frame_times = deque(maxlen=240)
+        self.key_at = None
+        self.trace_file = None
+
+    def record(self, phase, ms):
+        self.samples[phase].append(ms)
+        if self.trace_file: self.trace_file.write(f'{{"t": {time.perf_counter() - STARTUP_STARTED:.6f}, "phase": "{phase}", "ms": {ms:.3f}}}\n')
+
+    def record_since(self, phase, started):
+        self.record(phase, (time.perf_counter() - started) * 1000)
+
+    def key_received(self):
+        if self.key_at is None: self.key_at = time.perf_counter() # Latency counts from the first key the next frame answers
+
+    def frame_drawn(self, started):
+        """Closes a frame begun at `started`: records its draw time and, if a key is waiting on it, the key's latency."""
+        now = time.perf_counter()
+        self.record('draw', (now - started) * 1000)
+        self.frame_times.append(now)
+        if self.key_at is not None: self.record('latency', (now - self.key_at) * 1000); self.key_at = None
+
+    def percentiles(self, phase, points=(50, 95, 99)):
+        ordered = sorted(self.samples[phase])
+        if not ordered: return None
+        return [ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in points]
+
+    def fps(self, window=5.0):
+        """Frames drawn per second over the last `window` seconds; frames are only drawn when something changed."""
+        since = time.perf_counter() - window
+        return sum(1 for t in self.frame_times if t >= since) / window
+
+    def close(self):
+        if self.trace_file: self.trace_file.close(); self.trace_file = None
+
+class _TimedStdout:
+    """Wraps sys.stdout so each flush, which is when a frame reaches the terminal, is timed as the 'flush' phase."""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def flush(self):
+        started = time.perf_counter()
+        self._stream.flush()
+        UI_STATS.record_since('flush', started)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+UI_STATS = UILatencyStats()
+
+# --- Session Profiling ---
+class SessionProfiler:
+    """
+    Profiles a whole session for --profile-run: cProfile, a sampler that
+    collects the stacks of all threads every SAMPLE_INTERVAL seconds for flame
+    graphs, and tracemalloc for allocations. From Python 3.12, cProfile runs on
+    sys.monitoring, which allows one profiler per process and sees every thread,
+    though with their calls interleaved, so the sampled stacks are the per-thread
+    view there; before 3.12, each thread that runs Thread.run (so not
+    threading.Timer) gets a profile of its own. stop() writes a pstats file, a collapsed-stack
+    file and an allocation report by source line to `out_dir`, and returns
+    their paths.
+    """
+    SAMPLE_INTERVAL = 0.005
+    TOP_ALLOCATIONS = 30
+
+    def __init__(self, out_dir):
+        import cProfile
+        self.out_dir, self.prefix = Path(out_dir), f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.main_profile, self.thread_profiles, self._lock = cProfile.Profile(), [], threading.Lock()
+        self.stacks, self._stop = {}, threading.Event()
+        self._original_run = threading.Thread.run
+        self._sampler = threading.Thread(name="profile-sampler", daemon=True)
+        self._sampler.run = self._sample # An instance attribute, so the patched Thread.run below skips the sampler
+
+    def start(self):
+        import tracemalloc
+        profiler, original_run = self, self._original_run
+        def profiled_run(thread):
+            import cProfile
+            profile = cProfile.Profile()
+            try: profile.enable()
+            except ValueError: return original_run(thread) # Another profiler is active; the thread must still run
+            with profiler._lock: profiler.thread_profiles.append(profile)
+            try: original_run(thread)
+            finally: profile.disable()
+        tracemalloc.start()
+        if sys.version_info < (3, 12): threading.Thread.run = profiled_run # The process-wide profile covers threads from 3.12
+        self._sampler.start()
+        try: self.main_profile.enable()
+        except ValueError: pass # Another profiler is active; the sampler still covers every thread
+
+    def _sample(self):
+        own_id, labels = threading.get_ident(), {}
+        while not self._stop.wait(self.SAMPLE_INTERVAL):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id: continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None: label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    stack.append(label)
+                    frame = frame.f_back
+                key = ';'.join([names.get(thread_id, str(thread_id))] + stack[::-1])
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        import pstats, tracemalloc
+        self.main_profile.disable()
+        threading.Thread.run = self._original_run
+        self._stop.set()
+        self._sampler.join()
+        # Snapshotted before the reports are built, so their own allocations stay out of it
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                              tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = pstats.Stats(self.main_profile)
+        with self._lock: profiles = list(self.thread_profiles)
+        for profile in profiles:
+            profile.snapshot_stats() # Threads still running are read as they stand, without disabling them from here
+            if profile.stats: stats.add(_ProfileSnapshot(profile.stats))
+        pstats_path = self.out_dir / f"{self.prefix}.pstats"
+        stats.dump_stats(pstats_path)
+        collapsed_path = self.out_dir / f"{self.prefix}.collapsed"
+        with open(collapsed_path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()): f.write(f"{stack} {count}\n")
+        allocations_path = self.out_dir / f"{self.prefix}-allocations.txt"
+        with open(allocations_path, 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory: {current / 2**20:.1f} MiB live, {peak / 2**20:.1f} MiB peak\n")
+            f.write(f"Top {self.TOP_ALLOCATIONS} allocation sites by live size:\n")
+            f.write(f"{'KiB':>10}{'blocks':>10}  site\n")
+            for stat in snapshot.statistics('lineno')[:self.TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:>10.1f}{stat.count:>10}  {frame.filename}:{frame.lineno}\n")
+        return pstats_path, collapsed_path, allocations_path
+
+class _ProfileSnapshot:
+    """Hands pstats the stats of a profile without letting it call create_stats(), which would disable the profile."""
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
 # --- Core Application Logic ---
+HTTP_SESSION = None # One pooled, kept-alive connection to Reddit for the whole run, across profile switches
+
+def http_session():
+    """Returns HTTP_SESSION, importing requests on first use so the import stays off the startup path."""
+    global HTTP_SESSION
+    import requests
+    with data_lock:
+        if HTTP_SESSION is None: HTTP_SESSION = requests.Session()
+        return HTTP_SESSION
+
+def open_in_browser(url):
+    import webbrowser # Slow to import, and only needed once a link is opened
+    webbrowser.open(url)
+
+class RequestCancelled(Exception):
+    """Raised by RequestScheduler when the caller's `cancelled()` turns true before its response is complete."""
+
+class RequestScheduler:
+    """
+    Every request to Reddit goes through here. A token bucket paces requests
+    and is re-tuned from the X-Ratelimit-Remaining/-Reset headers of each
+    response, so the requests left in the current window are spread over the
+    time left in it. When the window runs dry or a 429 arrives, everything is
+    paused until the server says it resets. Waiting requests leave in priority
+    order, then first come first served.
+    """
+    PRIORITY_COMMENTS, PRIORITY_LISTING, PRIORITY_PREFETCH = 0, 1, 2 # User-initiated first
+    BURST = 5
+    DEFAULT_RATE = 10 / 60 # Requests per second until the first headers arrive; Reddit's anonymous limit
+    MAX_429_RETRIES = 1
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue, self._seq = [], 0
+        self._tokens, self._rate, self._refilled_at = float(self.BURST), self.DEFAULT_RATE, time.monotonic()
+        self._paused_until = 0.0
+        self._status = ""
+
+    def get(self, url, priority, cancelled=None, **kwargs):
+        """
+        Sends a GET once the bucket and the queue allow it and returns the
+        response, re-sent after a 429 if allowed. Raises RequestCancelled if
+        `cancelled()` turns true while the request waits its turn.
+        """
+        for attempt in range(self.MAX_429_RETRIES + 1):
+            self._acquire(priority, cancelled)
+            response = http_session().get(url, **kwargs)
+            self._observe(response)
+            if response.status_code != 429: break
+            if attempt < self.MAX_429_RETRIES: response.close() # Hands the pooled connection back before the retry
+        return response
+
+    @staticmethod
+    def raise_for_status(response):
+        """response.raise_for_status(), closing the response first if it raises so a `stream=True` body does not hold its connection."""
+        try: response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+
+    @staticmethod
+    def read_json(response, cancelled=None, chunk_size=16384):
+        """Reads the body of a `stream=True` response and parses it, closing the transfer early if `cancelled()` turns true."""
+        chunks = []
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if cancelled and cancelled(): raise RequestCancelled()
+                chunks.append(chunk)
+        finally: response.close()
+        return json.loads(b''.join(chunks))
+
+    def _refill(self, now):
+        self._tokens = min(self.BURST, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _acquire(self, priority, cancelled=None):
+        with self._cond:
+            self._seq += 1
+            ticket = (priority, self._seq)
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if cancelled and cancelled(): raise RequestCancelled()
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._queue[0] == ticket and self._tokens >= 1 and now >= self._paused_until: break
+                    if self._queue[0] != ticket: wait = None # Woken when the head leaves
+                    else: wait = max(self._paused_until - now, (1 - self._tokens) / self._rate, 0.01)
+                    if cancelled: wait = min(wait or 0.1, 0.1) # Polls, so a cancelled request leaves the queue promptly
+                    self._publish_status()
+                    self._cond.wait(wait)
+                self._tokens -= 1
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._publish_status()
+                self._cond.notify_all()
+
+    def _observe(self, response):
+        """Re-tunes the bucket from the rate-limit headers of `response`."""
+        headers = response.headers
+        try:
+            remaining = float(headers['X-Ratelimit-Remaining'])
+            reset = max(1.0, float(headers['X-Ratelimit-Reset']))
+        except (KeyError, ValueError, TypeError): remaining = reset = None
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if response.status_code == 429:
+                try: pause = float(headers['Retry-After'])
+                except (KeyError, ValueError, TypeError): pause = reset or 60
+                self._paused_until, self._tokens = now + pause, 0.0
+            elif remaining is not None:
+                if remaining < 1: self._paused_until, self._tokens = now + reset, 0.0
+                else: self._rate, self._tokens = remaining / reset, min(self._tokens, remaining)
+            self._publish_status()
+            self._cond.notify_all()
+
+    def _publish_status(self):
+        paused_for = self._paused_until - time.monotonic()
+        if paused_for > 0: status = f"Rate limited, resuming at {time.strftime('%H:%M:%S', time.localtime(time.time() + paused_for))}"
+        elif self._queue: status = f"{len(self._queue)} request{'s' if len(self._queue) > 1 else ''} queued"
+        else: status = ""
+        if status != self._status:
+            self._status = status
+            ARTICLES_UPDATED.set() # Redraws the footer
+
+    def status(self):
+        """Footer text: the throttling state or the queue depth, or "" while requests flow freely."""
+        with self._cond:
+            if self._status.startswith("Rate limited") and time.monotonic() >= self._paused_until: self._publish_status()
+            return self._status
+
+REQUEST_SCHEDULER = RequestScheduler()
+
 def fetch_articles_threaded():
     global last_checked_time, HAS_NEW_ARTICLES, CONNECTION_OK
+    import requests
     while not stop_thread_event.is_set():
+        fetch_now_event.clear()
         HAS_NEW_ARTICLES = False
+        with data_lock: db_path, subreddits = DB_FILE, SUBREDDITS_STRING # One profile per cycle, even if it switches meanwhile
         try:
-            with sqlite3.connect(DB_FILE) as conn:
+            with db_connection(db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT url FROM deleted_articles")
                 deleted_urls = {row[0] for row in cursor.fetchall()}
 
-            url = f"https://www.reddit.com/r/{SUBREDDITS_STRING}/new.json?limit=50"
+            url = f"https://www.reddit.com/r/{subreddits}/new.json?limit=50"
             headers = {"User-Agent": "live_news_feed_script/2.6"}
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            response = REQUEST_SCHEDULER.get(url, RequestScheduler.PRIORITY_LISTING, headers=headers, timeout=10)
+            RequestScheduler.raise_for_status(response)
 
             # If the above lines succeed, the connection is OK
             CONNECTION_OK = True
@@ -508,7 +2330,7 @@ def fetch_articles_threaded():
                 
                 if not post_data.get("is_self") and "crosspost_parent_list" not in post_data and post_data.get("url") and domain not in BLOCKED_DOMAINS:
                     article_data = {k: post_data.get(k) for k in ["title", "url", "subreddit", "created_utc", "permalink", "score", "num_comments"]}
-                    add_article_to_db(article_data, deleted_urls)
+                    add_article_to_db(article_data, deleted_urls, db_path)
 
             last_checked_time = time.strftime("%I:%M:%S %p")
             ARTICLES_UPDATED.set()
@@ -518,10 +2340,81 @@ def fetch_articles_threaded():
             # Trigger a redraw to show the red indicator immediately
             ARTICLES_UPDATED.set()
             pass
-
-        stop_thread_event.wait(timeout=FETCH_INTERVAL_SECONDS)
+        except sqlite3.Error: pass # E.g. locked by compaction's one-off VACUUM; the next cycle fetches again
+
+        # Waits in one-second steps so a FetchInterval changed meanwhile already applies to this wait
+        waited = 0
+        while waited < FETCH_INTERVAL_SECONDS and not fetch_now_event.is_set() and not stop_thread_event.wait(1): waited += 1
+
+# --- Engagement Refresh ---
+# Scores and comment counts keep moving long after an article is first fetched. They are re-read in batches
+# through /by_id/, often while an article is new and less often as it ages.
+ENGAGEMENT_SCHEDULE = ((3600, 300), (6 * 3600, 900), (24 * 3600, 3600), (3 * 86400, 6 * 3600)) # (age under, refresh every) in seconds
+ENGAGEMENT_VISIBLE_SECONDS = 600 # Articles on screen are refreshed at least this often, whatever their age
+ENGAGEMENT_BATCH_SIZE = 100 # The most fullnames /by_id/ takes at once
+ENGAGEMENT_MAX_BATCHES = 5 # Per cycle, so a backlog drains over several cycles instead of in one burst
+ENGAGEMENT_CYCLE_SECONDS = 60
+# A batch lands as one statement; fullnames Reddit no longer returns are only marked refreshed
+ENGAGEMENT_UPDATE_SQL = '''
+    WITH fresh (fullname, score, num_comments) AS (VALUES {values})
+    UPDATE {table} SET (score, num_comments, refreshed_utc) = (
+        SELECT COALESCE(f.score, {table}.score), COALESCE(f.num_comments, {table}.num_comments), ?
+        FROM fresh f WHERE f.fullname = {table}.fullname)
+    WHERE fullname IN (SELECT fullname FROM fresh)'''
+
+def due_for_engagement_refresh(visible_urls=(), now=None, db_path=None):
+    """
+    Fullnames whose engagement is due for a refresh: those of `visible_urls` first, then the
+    newest articles due by ENGAGEMENT_SCHEDULE, up to ENGAGEMENT_MAX_BATCHES batches.
+    """
+    now, limit = now or time.time(), ENGAGEMENT_BATCH_SIZE * ENGAGEMENT_MAX_BATCHES
+    cases = ' '.join("WHEN ? - created_utc < ? THEN ?" for _ in ENGAGEMENT_SCHEDULE)
+    with db_connection(db_path) as conn:
+        visible = conn.execute(f'''SELECT fullname FROM articles WHERE url IN ({','.join('?' for _ in visible_urls)})
+                                   AND fullname IS NOT NULL AND COALESCE(refreshed_utc, created_utc) < ?''',
+                               (*visible_urls, now - ENGAGEMENT_VISIBLE_SECONDS)).fetchall() if visible_urls else []
+        scheduled = conn.execute(f'''SELECT fullname FROM articles WHERE created_utc >= ? AND fullname IS NOT NULL
+                                     AND COALESCE(refreshed_utc, created_utc) < ? - (CASE {cases} END)
+                                     ORDER BY created_utc DESC LIMIT ?''',
+                                 (now - ENGAGEMENT_SCHEDULE[-1][0], now,
+                                  *(p for age, every in ENGAGEMENT_SCHEDULE for p in (now, age, every)), limit)).fetchall()
+    return list(dict.fromkeys(name for (name,) in visible + scheduled))[:limit]
+
+def fetch_engagement(fullnames):
+    """{fullname: (score, num_comments)} for up to ENGAGEMENT_BATCH_SIZE posts, requested at prefetch priority."""
+    url = f"https://www.reddit.com/by_id/{','.join(fullnames)}.json?limit={len(fullnames)}"
+    response = REQUEST_SCHEDULER.get(url, RequestScheduler.PRIORITY_PREFETCH, headers={"User-Agent": "live_news_feed_script/2.6"}, timeout=10)
+    RequestScheduler.raise_for_status(response)
+    posts = [post.get("data", {}) for post in response.json().get("data", {}).get("children", [])]
+    return {post["name"]: (post.get("score"), post.get("num_comments")) for post in posts if post.get("name")}
+
+def store_engagement(fullnames, engagement, db_path=None):
+    """Writes a batch of fetch_engagement results, stamping every fullname in `fullnames` as refreshed."""
+    conn = db_connection(db_path)
+    table = 'article_data' if conn.profile_id is not None else 'articles' # The shared store keeps engagement per article
+    values = [v for name in fullnames for v in (name, *engagement.get(name, (None, None)))]
+    with conn:
+        conn.execute(ENGAGEMENT_UPDATE_SQL.format(table=table, values=', '.join('(?, ?, ?)' for _ in fullnames)), (*values, time.time()))
+
+def engagement_refresh_threaded():
+    """Every ENGAGEMENT_CYCLE_SECONDS, refreshes the engagement that is due in the active profile."""
+    import requests
+    while not stop_thread_event.wait(ENGAGEMENT_CYCLE_SECONDS):
+        with data_lock: db_path, visible_urls = DB_FILE, VISIBLE_ARTICLE_URLS
+        try:
+            due = due_for_engagement_refresh(visible_urls, db_path=db_path)
+            for start in range(0, len(due), ENGAGEMENT_BATCH_SIZE):
+                if stop_thread_event.is_set(): return
+                batch = due[start:start + ENGAGEMENT_BATCH_SIZE]
+                store_engagement(batch, fetch_engagement(batch), db_path)
+        except (requests.exceptions.RequestException, sqlite3.Error, ValueError): pass # Tried again next cycle
 
 class NewsFeedMenu:
+    VIEW_MODES = ("All", "Unseen", "Highlights", "Bookmarks", "Video", "Read", "Stories")
+    CROSS_PROFILE_MODE = "All Profiles" # Not a filter of this profile's articles, so kept out of VIEW_MODES
+    PROFILE_CACHE_SIZE = 3
+    COMMENT_WORKERS = 2
+
     def __init__(self, active_profile, title="👽 Alien News Feed"):
         self.title, self.is_running, self.needs_redraw = title, True, True
         self.active_profile = active_profile
@@ -534,6 +2427,10 @@ class NewsFeedMenu:
         self.is_delete_confirm_view, self.is_exit_confirm_view = False, False
         self.is_search_view, self.search_query = False, ""
         self.search_input_active = False
+        self.search = IncrementalSearch()
+        self.search_dirty = False
+        self.mode_articles = []
+        self.story_sizes = {} # In the Stories view: {first article's URL: how many articles are collapsed under it}
 
         self.is_link_view = False
         self.extracted_links = []
@@ -541,6 +2438,8 @@ class NewsFeedMenu:
 
         self.page_jump = PAGE_JUMP
         self.selected_index, self.scroll_top = 0, 0
+        self.pinned_selection = None
+        self.new_above_count = 0
 
         self.comment_tree, self.visible_comments = [], []
         self.comment_view_status, self.comment_selected_index, self.comment_scroll_top = "", 0, 0
@@ -551,23 +2450,21 @@ class NewsFeedMenu:
         self.profile_action = None
         self.profiles = get_all_profiles()
         self.profile_status_message = ""
+        self.pending_profile = None # Switched to by the main loop, which owns the article lists
+        self.profile_cache = OrderedDict() # Profile name -> loaded articles and selection, most recently used last
+        self.load_generation, self.loaded_store = 0, None # See _load_articles
+        self.show_perf_overlay, self.perf_overlay_drawn = False, 0
+        self.comment_pool, self.comment_generation, self.comment_result = None, 0, None # See _open_comments
 
-        self.view_modes = ["All", "Unseen", "Highlights", "Bookmarks", "Video", "Read"]
+        self.view_modes = [*self.VIEW_MODES, self.CROSS_PROFILE_MODE]
         self.current_view_mode_index = 0
         self.filter_menu_selected_index = 0
 
         self.settings_selected_index = 0
         self.theme_names = list(THEMES.keys())
         theme_name, _ = load_profile_settings()
-        self.current_theme_index = self.theme_names.index(theme_name) if theme_name in self.theme_names else 0
-        self.theme = THEMES[self.theme_names[self.current_theme_index]]
-        self.fetch_interval_setting = FETCH_INTERVAL_SECONDS
-        self.show_clock_setting = SHOW_CLOCK
-        # --- ADD THIS LINE ---
-        self.video_player_path_setting = VIDEO_PLAYER_PATH
-        self.blocked_domains_setting = ','.join(sorted(list(BLOCKED_DOMAINS)))
-        self.highlight_keywords_setting = ','.join(sorted(list(HIGHLIGHT_KEYWORDS)))
-        self.mute_keywords_setting = ','.join(sorted(list(MUTE_KEYWORDS)))
+        self._load_settings_fields(theme_name)
+        self.last_config_check = time.monotonic()
         self.last_displayed_minute = -1
         self.last_known_width, self.last_known_height = os.get_terminal_size()
 
@@ -697,7 +2594,7 @@ class NewsFeedMenu:
             url = self.action_menu_article['url']
             if action == "delete_article":
                 self.article_to_delete, self.is_delete_confirm_view = self.action_menu_article, True
-            elif action == "open_article": threading.Thread(target=webbrowser.open, args=(url,)).start()
+            elif action == "open_article": threading.Thread(target=open_in_browser, args=(url,)).start()
             elif action == "watch_mpv":
                 try:
                     kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
@@ -707,12 +2604,12 @@ class NewsFeedMenu:
                     subprocess.Popen([VIDEO_PLAYER_PATH, url], **kwargs)
                     self.status_message, self.status_message_timer = "Launching video in player...", 50
                 except FileNotFoundError: self.status_message, self.status_message_timer = f"Error: '{VIDEO_PLAYER_PATH}' not found.", 50
-            elif action == "open_comments": threading.Thread(target=webbrowser.open, args=(f"https://www.reddit.com{self.action_menu_article['permalink']}",)).start()
-            elif action == "summarize": threading.Thread(target=webbrowser.open, args=(f"https://www.perplexity.ai/?s=o&q={quote(f'summarize {url}')}",)).start()
+            elif action == "open_comments": threading.Thread(target=open_in_browser, args=(f"https://www.reddit.com{self.action_menu_article['permalink']}",)).start()
+            elif action == "summarize": threading.Thread(target=open_in_browser, args=(f"https://www.perplexity.ai/?s=o&q={quote(f'summarize {url}')}",)).start()
             elif action == "copy_url":
                 self._copy_to_clipboard(url)
                 self.status_message, self.status_message_timer = "URL copied to clipboard!", 50
-            elif action == "archive": threading.Thread(target=webbrowser.open, args=(f"https://archive.is/{quote(url)}",)).start()
+            elif action == "archive": threading.Thread(target=open_in_browser, args=(f"https://archive.is/{quote(url)}",)).start()
             elif action == "exclude_domain":
                 domain_to_block = get_domain_from_url(url)
                 if domain_to_block and domain_to_block not in BLOCKED_DOMAINS:
@@ -837,20 +2734,42 @@ class NewsFeedMenu:
             result.append(node)
             if not node.is_collapsed and node.children: self._flatten_comment_tree(node.children, result)
 
-    def _fetch_comments_threaded(self, permalink):
-        if not permalink: self.comment_view_status, self.needs_redraw = "Error: No permalink.", True; return
-        try:
-            url, headers = f"https://www.reddit.com{permalink.rstrip('/')}.json", {"User-Agent": "live_news_feed_script/2.6"}
-            response = requests.get(url, headers=headers, timeout=10); response.raise_for_status()
-            raw_comments = response.json()[1].get("data", {}).get("children", [])
-            if not raw_comments: self.comment_view_status = "No comments found."
-            else: self.comment_tree, self.comment_view_status = self._parse_comments_to_tree(raw_comments), ""
-            self.comment_selected_index, self.comment_scroll_top = 0, 0
-
-            # Prepare the lines for drawing once
-            self._prepare_comment_lines()
-
-        except (requests.exceptions.RequestException, IndexError, KeyError) as e: self.comment_view_status = f"Error: {e}"
+    def _open_comments(self, permalink):
+        """Loads `permalink`'s comments on the worker pool; a load still running for an earlier open is dropped."""
+        if self.comment_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.comment_pool = ThreadPoolExecutor(max_workers=self.COMMENT_WORKERS, thread_name_prefix="comments")
+        self.comment_generation += 1
+        self.comment_tree, self.comment_result = [], None
+        self.is_comment_view, self.comment_view_status = True, "Loading comments..."
+        self.comment_pool.submit(self._fetch_comments_threaded, permalink, self.comment_generation)
+
+    def _close_comments(self):
+        self.comment_generation += 1 # Cancels the load in flight, if any
+        self.is_comment_view, self.comment_tree = False, []
+
+    def _fetch_comments_threaded(self, permalink, generation):
+        """Runs on the comment pool; hands (generation, status, tree) to the main loop unless a newer open or a close made it stale."""
+        import requests
+        is_stale = lambda: generation != self.comment_generation
+        if not permalink: status, tree = "Error: No permalink.", []
+        else:
+            try:
+                url, headers = f"https://www.reddit.com{permalink.rstrip('/')}.json", {"User-Agent": "live_news_feed_script/2.6"}
+                response = REQUEST_SCHEDULER.get(url, RequestScheduler.PRIORITY_COMMENTS, cancelled=is_stale, headers=headers, timeout=10, stream=True)
+                RequestScheduler.raise_for_status(response)
+                raw_comments = RequestScheduler.read_json(response, is_stale)[1].get("data", {}).get("children", [])
+                status, tree = ("No comments found.", []) if not raw_comments else ("", self._parse_comments_to_tree(raw_comments))
+            except RequestCancelled: return
+            except (requests.exceptions.RequestException, ValueError, IndexError, KeyError) as e: status, tree = f"Error: {e}", []
+        if not is_stale(): self.comment_result = generation, status, tree
+
+    def _apply_comment_result(self):
+        (generation, status, tree), self.comment_result = self.comment_result, None
+        if generation != self.comment_generation: return
+        self.comment_view_status, self.comment_tree = status, tree
+        self.comment_selected_index, self.comment_scroll_top = 0, 0
+        self._prepare_comment_lines() # Prepare the lines for drawing once
         self.needs_redraw = True
 
     def _format_comment_body(self, text):
@@ -975,7 +2894,7 @@ class NewsFeedMenu:
         self._draw(items_data, is_background=True)
         term_w, term_h = os.get_terminal_size()
         # Adjusted height for the new lines of text
-        pop_w, pop_h = 70, 19
+        pop_w, pop_h = 70, 21
         start_x, start_y = (term_w - pop_w) // 2, (term_h - pop_h) // 2
         self._draw_popup_border(start_x, start_y, pop_w, pop_h, "Import from Backup")
         pop_bg, pop_fg = self.theme['popup_bg'], self.theme['popup_fg']
@@ -996,6 +2915,8 @@ class NewsFeedMenu:
             f"     {Colors.LIGHT_GREY}(Imports to the currently active profile){pop_fg}",
             "",
             f"   > {Colors.CYAN}{executable_name} --import /path/to/backup.db --profile <NAME>{pop_fg}",
+            f"   > {Colors.CYAN}{executable_name} --import /path/to/backup.db --merge [--dry-run]{pop_fg}",
+            f"     {Colors.LIGHT_GREY}(Keeps current articles and adds the backup's){pop_fg}",
             "",
             f"{Colors.YELLOW}Your config folder path is:",
             f"{Colors.CYAN}{CONFIG_DIR.resolve()}",
@@ -1015,7 +2936,7 @@ class NewsFeedMenu:
     def _draw_help_menu(self, items_data):
         self._draw(items_data, is_background=True)
         term_w, term_h = os.get_terminal_size()
-        pop_w, pop_h = 70, 17
+        pop_w, pop_h = 70, 18
         start_x, start_y = (term_w - pop_w) // 2, (term_h - pop_h) // 2
         self._draw_popup_border(start_x, start_y, pop_w, pop_h, "Help / About")
         pop_bg, pop_fg = self.theme['popup_bg'], self.theme['popup_fg']
@@ -1036,6 +2957,7 @@ class NewsFeedMenu:
             f"  {key_color}[v]{desc_color}       - Open Filter Menu",
             f"  {key_color}[p]{desc_color}       - Open Profile Manager",
             f"  {key_color}[s]{desc_color}       - Open settings",
+            f"  {key_color}[f]{desc_color}       - Toggle the performance overlay",
             f"  {key_color}[h]{desc_color}       - Show this help screen",
             f"  {key_color}[ESC]{desc_color}     - Go back, clear search, or show quit confirmation",
         ]
@@ -1241,6 +3163,7 @@ class NewsFeedMenu:
         sys.stdout.flush()
 
     def _draw(self, items_data, is_background=False):
+        global VISIBLE_ARTICLE_URLS
         if not is_background: sys.stdout.write(Colors.RESET)
         os.system('cls' if os.name == 'nt' else 'clear')
         term_w, term_h = os.get_terminal_size()
@@ -1252,7 +3175,7 @@ class NewsFeedMenu:
         current_mode = self.view_modes[self.current_view_mode_index]
         title += f" [{current_mode}]"
 
-        if self.is_search_view: title += f" [Search: {self.search_query}]"
+        if self.is_search_view: title += f" [Search: {self.search_query}{'…' if self.search.is_busy() else ''}]"
         BG_BAR, FG_BAR = self.theme['bar_bg'], self.theme['bar_fg']
 
         if self.show_clock_setting:
@@ -1273,19 +3196,26 @@ class NewsFeedMenu:
             max_view = max(1, term_h - 5)
             if self.selected_index < self.scroll_top: self.scroll_top = self.selected_index
             if self.selected_index >= self.scroll_top + max_view: self.scroll_top = self.selected_index-max_view+1
+            if self.scroll_top == 0: self.new_above_count = 0 # Arrivals above the viewport are now on screen
+            visible_urls = []
             for i in range(self.scroll_top, min(self.scroll_top+max_view, len(items_data))):
-                item, row = items_data[i], i-self.scroll_top+3
+                try: item, row = items_data[i], i-self.scroll_top+3
+                except IndexError: break # Rows removed since the view was counted; the window has recounted
+                visible_urls.append(item['url'])
                 is_highlighted = any(kw in item['title'].lower() for kw in HIGHLIGHT_KEYWORDS)
                 highlight_icon = f"{Colors.YELLOW}★ {Colors.RESET}" if is_highlighted else ""
 
                 sub, src = f"{Colors.GREEN}[{item.get('subreddit')}]", f"{Colors.CYAN}[{item.get('source_domain','')}]"
+                if item.get('profile'): sub = f"{Colors.MAGENTA}<{item['profile']}> {sub}"
                 bookmark = "🔖 " if item.get('is_bookmarked') else ""
                 video_icon = "🎬 " if item.get('source_domain') in ['youtube.com', 'youtu.be'] else ""
+                collapsed = self.story_sizes.get(item['url']) if self.story_sizes else 0
+                story = f"{Colors.MAGENTA}+{collapsed}{Colors.RESET} " if collapsed else ""
                 title_color = ""
                 if item.get('is_new'): title_color = self.theme['new_fg']
                 elif item.get('is_read'): title_color = Colors.LIGHT_GREY
 
-                display = f"{title_color}{format_time_ago(item.get('created_utc')):<8} {sub} {src}{Colors.RESET} {highlight_icon}{bookmark}{video_icon}{item.get('title')}{Colors.RESET}"
+                display = f"{title_color}{format_time_ago(item.get('created_utc')):<8} {sub} {src}{Colors.RESET} {highlight_icon}{bookmark}{video_icon}{story}{item.get('title')}{Colors.RESET}"
                 line = f"> {display}" if i == self.selected_index else f"  {display}"
 
                 plain_text_len = len(re.sub(r'\x1b\[[0-9;]*m', '', line))
@@ -1298,6 +3228,7 @@ class NewsFeedMenu:
                 if i == self.selected_index and not is_background:
                     sys.stdout.write(f'\x1b[{row};1H{self.theme["highlight_bg"]}{self.theme["highlight_fg"]}{line_to_draw}{Colors.RESET}')
                 else: sys.stdout.write(f'\x1b[{row};1H{line_to_draw}{Colors.RESET}')
+            VISIBLE_ARTICLE_URLS = tuple(visible_urls) # Refreshed first by engagement_refresh_threaded
 
         footer_row = term_h
         if self.status_message_timer > 0: help_text = self.status_message
@@ -1308,6 +3239,11 @@ class NewsFeedMenu:
 
         status_indicator = "🟢" if CONNECTION_OK else "🔴"
         last_checked = f"{status_indicator} Last checked: {last_checked_time}"
+        if self.new_above_count: last_checked = f"▲ {self.new_above_count} new | {last_checked}"
+        if BACKUP_STATUS: last_checked = f"{BACKUP_STATUS} | {last_checked}"
+        if COMPACTION_STATUS: last_checked = f"{COMPACTION_STATUS} | {last_checked}"
+        network_status = REQUEST_SCHEDULER.status()
+        if network_status: last_checked = f"{network_status} | {last_checked}"
 
         padding = ' ' * max(0, safe_width - len(help_text) - len(last_checked))
         footer_text = f"{help_text}{padding}{last_checked}"
@@ -1315,10 +3251,116 @@ class NewsFeedMenu:
         sys.stdout.write(f'\x1b[{footer_row};1H{BG_BAR}{FG_BAR}{footer_text}{Colors.RESET}')
         sys.stdout.flush()
 
+    def _load_settings_fields(self, theme_name):
+        """Copies the settings globals into the fields the settings screen edits."""
+        self.current_theme_index = self.theme_names.index(theme_name) if theme_name in self.theme_names else 0
+        self.theme = THEMES[self.theme_names[self.current_theme_index]]
+        self.fetch_interval_setting = FETCH_INTERVAL_SECONDS
+        self.show_clock_setting = SHOW_CLOCK
+        self.video_player_path_setting = VIDEO_PLAYER_PATH
+        self.blocked_domains_setting = ','.join(sorted(list(BLOCKED_DOMAINS)))
+        self.highlight_keywords_setting = ','.join(sorted(list(HIGHLIGHT_KEYWORDS)))
+        self.mute_keywords_setting = ','.join(sorted(list(MUTE_KEYWORDS)))
+
+    def _apply_config_changes(self, items_data):
+        """
+        Applies edits made to config.ini outside the app; the fetcher uses the new values from its next cycle.
+        An edit that moves the profile to another DB (DatabaseFile, SharedArticleStore) reopens it like a profile switch.
+        """
+        self.profiles = get_all_profiles()
+        if self.active_profile not in self.profiles:
+            self.pending_profile = CONFIG.config.get('Settings', 'ActiveProfile', fallback='Main') # The active profile was removed
+            return
+        if str(profile_db_path(self.active_profile)) != str(DB_FILE):
+            self._switch_profile(self.active_profile, items_data, reopen=True)
+            self.status_message = "Settings reloaded from config.ini; reopened the database."
+            return
+        theme_name, _ = load_profile_settings(self.active_profile)
+        sync_blocked_domains()
+        self._load_settings_fields(theme_name)
+        self.status_message, self.status_message_timer = "Settings reloaded from config.ini.", 50
+        self.force_regenerate_view = self.needs_redraw = True
+
+    def _load_articles(self):
+        """
+        Shows the active profile's articles through the windowed path right away,
+        so the first screen costs a count and one LIMIT query, and loads the full
+        store on a worker thread; the main loop swaps it in when it lands. Huge
+        histories stay windowed.
+        """
+        ARTICLE_STATE_WRITER.flush() # Earlier changes land before the loader's snapshot
+        self.load_generation += 1
+        self.is_windowed, self.master_article_list, self.loaded_store = True, PendingArticleStore(), None
+        ARTICLE_STATE_WRITER.journal = []
+        threading.Thread(target=self._load_articles_threaded, args=(self.load_generation, DB_FILE), daemon=True).start()
+
+    def _load_articles_threaded(self, generation, db_path):
+        # Huge histories are paged from the DB through indexed per-view queries instead of loaded whole
+        store = None if count_articles(db_path=db_path) > WINDOWED_VIEW_THRESHOLD else load_article_store(db_path)
+        if generation == self.load_generation: self.loaded_store = generation, store
+
+    def _finish_loading_articles(self, items_data):
+        """Swaps in the store loaded by _load_articles, replaying the edits made while it loaded."""
+        (generation, store), self.loaded_store = self.loaded_store, None
+        if generation != self.load_generation: return # Loaded for a profile that's no longer shown
+        pending, self.master_article_list = self.master_article_list, ColumnarArticleStore()
+        journal, ARTICLE_STATE_WRITER.journal = ARTICLE_STATE_WRITER.journal, None
+        trace_startup("articles loaded")
+        if store is None: return
+        for (db_path, url), flags in journal:
+            if db_path == str(DB_FILE): store.set_flags(url, flags)
+        pending.replay(store)
+        merge_new_articles(store)
+        self.master_article_list, self.is_windowed = store, False
+        if not self.is_search_view: self.pinned_selection = self._selected_article(items_data), self.selected_index
+        self.force_regenerate_view = True
+
+    def _articles_signature(self):
+        """Changes whenever the active DB is written, by this thread's connection or any other."""
+        conn = db_connection()
+        return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+    def _switch_profile(self, profile_name, items_data, reopen=False):
+        """
+        Makes `profile_name` the active profile in place: settings, DB and the
+        fetcher's target swap together, the HTTP session and workers stay up, and
+        the loaded articles of the last PROFILE_CACHE_SIZE profiles are kept, so
+        switching back only merges what arrived since. `reopen` drops that cache,
+        for when the profiles' DBs themselves have moved.
+        """
+        ARTICLE_STATE_WRITER.flush()
+        if reopen: self.profile_cache.clear()
+        elif not isinstance(self.master_article_list, PendingArticleStore): # Still loading, so nothing to keep
+            self.profile_cache[self.active_profile] = (self.master_article_list, self.is_windowed, self._articles_signature(),
+                                                       (self._selected_article(items_data), self.selected_index))
+            self.profile_cache.move_to_end(self.active_profile)
+        set_active_profile(profile_name)
+        with data_lock: theme_name, self.active_profile = load_profile_settings(profile_name)
+        init_db(DB_FILE)
+        sync_blocked_domains()
+        cached = self.profile_cache.pop(self.active_profile, None)
+        if cached and cached[2] == self._articles_signature(): # No writes since it was cached: fetcher, state writer, compaction or engagement refresh
+            self.load_generation, ARTICLE_STATE_WRITER.journal = self.load_generation + 1, None # Drops a load still running for the previous profile
+            self.master_article_list, self.is_windowed, _, self.pinned_selection = cached
+            if not self.is_windowed: merge_new_articles(self.master_article_list)
+        else:
+            self._load_articles()
+            self.pinned_selection = None
+        self.profiles = get_all_profiles()
+        for name in [n for n in self.profile_cache if n not in self.profiles]: del self.profile_cache[name]
+        while len(self.profile_cache) > self.PROFILE_CACHE_SIZE: self.profile_cache.popitem(last=False)
+        self._load_settings_fields(theme_name)
+        self.search.cancel()
+        self.is_search_view, self.search_input_active, self.search_query = False, False, ""
+        self.selected_index = self.scroll_top = 0
+        self.is_profile_view, self.status_message, self.status_message_timer = False, f"Switched to '{self.active_profile}'.", 50
+        fetch_now_event.set()
+        self.force_regenerate_view = self.needs_redraw = True
+
     def show(self):
-        global HAS_NEW_ARTICLES, NEEDS_RESTART
-        self.master_article_list = get_articles_from_db()
-        items_data = []
+        global HAS_NEW_ARTICLES, COMPACTION_REPORT
+        self._load_articles()
+        items_data, painted = [], False
         while self.is_running:
             # Check for terminal resize
             current_width, current_height = os.get_terminal_size()
@@ -1326,47 +3368,77 @@ class NewsFeedMenu:
                 self.needs_redraw = True
                 self.last_known_width, self.last_known_height = current_width, current_height
 
-            if NEEDS_RESTART:
-                self.is_running = False
-                continue
+            if self.pending_profile is not None:
+                profile_name, self.pending_profile = self.pending_profile, None
+                self._switch_profile(profile_name, items_data)
+            if self.comment_result is not None: self._apply_comment_result()
+            if self.loaded_store is not None:
+                self._finish_loading_articles(items_data)
+                if STARTUP_PHASES is not None: self.is_running = False # --startup-trace measures one start, then quits
             if self.status_message_timer > 0:
                 self.status_message_timer -= 1
                 if self.status_message_timer == 0: self.status_message, self.needs_redraw = "", True
             if ARTICLES_UPDATED.is_set():
-                if HAS_NEW_ARTICLES:
-                    self.master_article_list = get_articles_from_db()
-                    with data_lock:
-                        if HAS_NEW_ARTICLES: self.selected_index, self.scroll_top, HAS_NEW_ARTICLES = 0,0,False
-                self.force_regenerate_view = True
+                with data_lock: has_new, HAS_NEW_ARTICLES = HAS_NEW_ARTICLES, False
+                if has_new:
+                    # Merge only the new rows and keep the cursor on the article being read
+                    self.pinned_selection = self._selected_article(items_data), self.selected_index
+                    if not self.is_windowed: merge_new_articles(self.master_article_list)
+                    self.force_regenerate_view = True
+                self.needs_redraw = True
                 ARTICLES_UPDATED.clear()
+            if COMPACTION_REPORT:
+                with data_lock: report, COMPACTION_REPORT = COMPACTION_REPORT, None
+                self.status_message, self.status_message_timer = format_compaction_report(report), 80
+                if report['articles']:
+                    self.pinned_selection = self._selected_article(items_data), self.selected_index
+                    if isinstance(self.master_article_list, PendingArticleStore): self._load_articles() # Reload from after the compaction
+                    elif not self.is_windowed: self.master_article_list = load_article_store()
+                    self.force_regenerate_view = True
+                self.needs_redraw = True
+            if time.monotonic() - self.last_config_check >= CONFIG_CHECK_SECONDS:
+                self.last_config_check = time.monotonic()
+                if CONFIG.reload_if_changed(): self._apply_config_changes(items_data)
             if self.show_clock_setting:
                 current_minute = time.localtime().tm_min
                 if current_minute != self.last_displayed_minute:
                     self.last_displayed_minute, self.needs_redraw = current_minute, True
 
             if self.force_regenerate_view:
-                self.all_articles = [a for a in self.master_article_list if not any(kw in a['title'].lower() for kw in MUTE_KEYWORDS)] if MUTE_KEYWORDS else self.master_article_list
+                started = time.perf_counter()
                 current_mode = self.view_modes[self.current_view_mode_index]
-                if current_mode == "Bookmarks": items_data = [a for a in self.all_articles if a['is_bookmarked']]
-                elif current_mode == "Highlights": items_data = [a for a in self.all_articles if any(kw in a['title'].lower() for kw in HIGHLIGHT_KEYWORDS)]
-                elif current_mode == "Unseen": items_data = [a for a in self.all_articles if a['is_new']]
-                elif current_mode == "Read": items_data = [a for a in self.all_articles if a['is_read']]
-                elif current_mode == "Video": items_data = [a for a in self.all_articles if get_domain_from_url(a.get('url')) in ['youtube.com', 'youtu.be', 'vimeo.com']]
-                else: items_data = self.all_articles
-
-                if self.is_search_view:
-                    q = self.search_query.lower()
-                    items_data = [
-                        a for a in items_data if
-                        q in a['title'].lower()
-                        or q in a.get('source_domain','').lower()
-                        or q in a.get('subreddit', '').lower()
-                    ]
+                stories = load_stories() if current_mode == "Stories" else {}
+                if current_mode == self.CROSS_PROFILE_MODE:
+                    ARTICLE_STATE_WRITER.flush()
+                    view = CrossProfileTimeline()
+                elif self.is_windowed:
+                    ARTICLE_STATE_WRITER.flush() # The window reads flags back from the DB
+                    view = WindowedArticleList(*compile_view_query(current_mode))
+                else: view = filter_store_view(self.master_article_list, current_mode, stories)
+                self.story_sizes = {seed: len(urls) for seed, urls in stories.items()}
+
+                if isinstance(self.mode_articles, CrossProfileTimeline) and self.mode_articles not in (view, items_data): self.mode_articles.close()
+                self.mode_articles = view
+                # A search keeps showing its last result until take_result() has the one for the new view
+                if self.is_search_view: self.search_dirty = True
+                else: items_data = view
 
                 self.force_regenerate_view = False
                 self.needs_redraw = True
+                if not self.is_search_view: self._restore_pinned_selection(items_data)
+                UI_STATS.record_since('regen', started)
+
+            if self.is_search_view:
+                if self.search_dirty:
+                    self.search.submit(self.mode_articles, self.search_query.lower())
+                    self.search_dirty = False
+                results = self.search.take_result()
+                if results is not None:
+                    items_data, self.needs_redraw = results, True
+                    self._restore_pinned_selection(items_data)
 
             if self.needs_redraw:
+                started = time.perf_counter()
                 if self.is_delete_confirm_view: self._draw_confirmation_popup(items_data, "Permanently delete this article? (y/n)")
                 elif self.is_exit_confirm_view: self._draw_confirmation_popup(items_data, "Are you sure you want to quit? (y/n)")
                 elif self.is_action_menu_view: self._draw_action_menu(items_data)
@@ -1380,9 +3452,15 @@ class NewsFeedMenu:
                 elif self.is_subreddit_edit_view: self._draw_subreddit_editor(items_data)
                 else: self._draw(items_data)
                 self.needs_redraw = False
+                UI_STATS.frame_drawn(started)
+                if not painted: trace_startup("first frame"); painted = True
+                if self.show_perf_overlay: self._draw_perf_overlay()
+            elif self.show_perf_overlay and time.monotonic() - self.perf_overlay_drawn >= 1: self._draw_perf_overlay()
 
             key = getch()
             if not key: continue
+            UI_STATS.key_received()
+            started = time.perf_counter()
             if self.is_delete_confirm_view: self.handle_delete_confirm_input(key, items_data)
             elif self.is_exit_confirm_view: self.handle_exit_confirm_input(key)
             elif self.is_action_menu_view: self.handle_action_menu_input(key)
@@ -1396,12 +3474,43 @@ class NewsFeedMenu:
             elif self.is_subreddit_edit_view: self.handle_subreddit_edit_input(key)
             elif self.is_search_view: self.handle_search_view_input(key, items_data)
             else: self.handle_main_view_input(key, items_data)
+            UI_STATS.record_since('input', started)
+
+    def _draw_perf_overlay(self):
+        """Draws the UI timings in a box at the top right, over whatever is on screen."""
+        term_w, _ = os.get_terminal_size()
+        box_w = 40
+        start_x = max(1, term_w - box_w)
+        pop_bg, pop_fg = self.theme['popup_bg'], self.theme['popup_fg']
+        lines = [f"{'ms (last ' + str(UILatencyStats.WINDOW) + ')':<14}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for phase in UILatencyStats.PHASES:
+            points = UI_STATS.percentiles(phase)
+            lines.append(f"{phase:<14}" + (''.join(f"{p:7.1f}" for p in points) if points else f"{'-':>7}" * 3))
+        lines.append(f"{UI_STATS.fps():.1f} frames/s over 5 s")
+        for i, line in enumerate(lines):
+            sys.stdout.write(f"\x1b[{2 + i};{start_x}H{pop_bg}{pop_fg} {line.ljust(box_w - 2)} {Colors.RESET}")
+        sys.stdout.flush()
+        self.perf_overlay_drawn = time.monotonic()
+
+    def _selected_article(self, items_data):
+        return items_data[self.selected_index] if 0 <= self.selected_index < len(items_data) else None
+
+    def _restore_pinned_selection(self, items_data):
+        """Moves the cursor back onto the article selected before a refresh and counts rows that landed above it."""
+        if not self.pinned_selection: return
+        (article, old_index), self.pinned_selection = self.pinned_selection, None
+        if article is None or not hasattr(items_data, 'index_of'): return
+        new_index = items_data.index_of(article)
+        if new_index is None: return
+        shift = new_index - old_index
+        self.selected_index, self.scroll_top = new_index, max(0, self.scroll_top + shift)
+        if shift > 0: self.new_above_count += shift
 
     def handle_delete_confirm_input(self, key, items_data):
         if key.lower() == 'y':
             if self.article_to_delete:
-                block_and_delete_article(self.article_to_delete['url'])
-                self.master_article_list = [a for a in self.master_article_list if a['url'] != self.article_to_delete['url']]
+                block_and_delete_article(self.article_to_delete['url'], self.article_to_delete.get('db_path'))
+                self.master_article_list.discard(self.article_to_delete['url'])
                 self.force_regenerate_view = True
                 self.status_message, self.status_message_timer = "Article deleted.", 50
 
@@ -1442,7 +3551,7 @@ class NewsFeedMenu:
             url = self.action_menu_article['url']
             if action == "delete_article":
                 self.article_to_delete, self.is_delete_confirm_view = self.action_menu_article, True
-            elif action == "open_article": threading.Thread(target=webbrowser.open, args=(url,)).start()
+            elif action == "open_article": threading.Thread(target=open_in_browser, args=(url,)).start()
             elif action == "watch_video":
                 try:
                     kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
@@ -1451,18 +3560,18 @@ class NewsFeedMenu:
                     subprocess.Popen([VIDEO_PLAYER_PATH, url], **kwargs)
                     self.status_message, self.status_message_timer = "Launching in Video Player...", 50
                 except FileNotFoundError: self.status_message, self.status_message_timer = f"Error: '{VIDEO_PLAYER_PATH}' not found.", 50
-            elif action == "open_comments": threading.Thread(target=webbrowser.open, args=(f"https://www.reddit.com{self.action_menu_article['permalink']}",)).start()
-            elif action == "summarize": threading.Thread(target=webbrowser.open, args=(f"https://www.perplexity.ai/?s=o&q={quote(f'summarize {url}')}",)).start()
+            elif action == "open_comments": threading.Thread(target=open_in_browser, args=(f"https://www.reddit.com{self.action_menu_article['permalink']}",)).start()
+            elif action == "summarize": threading.Thread(target=open_in_browser, args=(f"https://www.perplexity.ai/?s=o&q={quote(f'summarize {url}')}",)).start()
             elif action == "copy_url":
                 self._copy_to_clipboard(url)
                 self.status_message, self.status_message_timer = "URL copied to clipboard!", 50
-            elif action == "archive": threading.Thread(target=webbrowser.open, args=(f"https://archive.is/{quote(url)}",)).start()
+            elif action == "archive": threading.Thread(target=open_in_browser, args=(f"https://archive.is/{quote(url)}",)).start()
             elif action == "exclude_domain":
                 domain_to_block = get_domain_from_url(url)
                 if domain_to_block and domain_to_block not in BLOCKED_DOMAINS:
                     BLOCKED_DOMAINS.add(domain_to_block)
                     save_general_settings(self.theme_names[self.current_theme_index], self.fetch_interval_setting, self.show_clock_setting, BLOCKED_DOMAINS, VIDEO_PLAYER_PATH)
-                    self.all_articles = [a for a in self.all_articles if get_domain_from_url(a.get('url')) != domain_to_block]
+                    sync_blocked_domains()
                     self.blocked_domains_setting = ','.join(sorted(list(BLOCKED_DOMAINS)))
                     self.status_message, self.status_message_timer = f"Domain '{domain_to_block}' is now hidden.", 50
                     self.force_regenerate_view = True
@@ -1478,12 +3587,14 @@ class NewsFeedMenu:
             VIDEO_PLAYER_PATH = self.video_player_path_setting.strip()
             save_general_settings(self.theme_names[self.current_theme_index], self.fetch_interval_setting,
                                  self.show_clock_setting, BLOCKED_DOMAINS, VIDEO_PLAYER_PATH)
+            sync_blocked_domains()
 
             self.highlight_keywords_setting = self.highlight_keywords_setting.strip(',')
             self.mute_keywords_setting = self.mute_keywords_setting.strip(',')
             HIGHLIGHT_KEYWORDS = {kw.strip().lower() for kw in self.highlight_keywords_setting.split(',') if kw.strip()}
             MUTE_KEYWORDS = {kw.strip().lower() for kw in self.mute_keywords_setting.split(',') if kw.strip()}
             save_profile_keywords(self.active_profile, self.highlight_keywords_setting, self.mute_keywords_setting)
+            load_profile_settings(self.active_profile) # FetchInterval and ShowClock apply from the fetcher's next wait on
 
             self.is_settings_view = False
             self.force_regenerate_view = True
@@ -1523,11 +3634,8 @@ class NewsFeedMenu:
                     export_bookmarks_to_html()
                     self.status_message, self.status_message_timer, self.is_settings_view = "Bookmarks exported!", 50, False
                 elif idx == 8:  # Export Full Backup
-                    backups_dir = CONFIG_DIR / "backups"
-                    backups_dir.mkdir(exist_ok=True)
-                    dest_path = backups_dir / f"backup-{time.strftime('%Y%m%d-%H%M%S')}.db"
-                    shutil.copy(DB_FILE, dest_path)
-                    self.status_message, self.status_message_timer, self.is_settings_view = f"Backup saved!", 50, False
+                    message = "Backing up in the background..." if start_background_backup() else "A backup is already running."
+                    self.status_message, self.status_message_timer, self.is_settings_view = message, 30, False
                 elif idx == 9:  # Import from Backup
                     self.is_settings_view = False
                     self.is_import_view = True
@@ -1544,7 +3652,7 @@ class NewsFeedMenu:
         elif key == "ENTER":
             if self.extracted_links:
                 url_to_open = self.extracted_links[self.link_selected_index]['url']
-                threading.Thread(target=webbrowser.open, args=(url_to_open,)).start()
+                threading.Thread(target=open_in_browser, args=(url_to_open,)).start()
                 # Close the popup after opening the link
                 self.is_link_view = False
                 self.extracted_links = []
@@ -1580,8 +3688,7 @@ class NewsFeedMenu:
 
             if original_index != self.comment_selected_index: self.needs_redraw = True
 
-        if key == "ESC":
-            self.is_comment_view, self.comment_tree = False, []
+        if key == "ESC": self._close_comments()
         self.needs_redraw = True
 
     def handle_search_view_input(self, key, items_data):
@@ -1590,24 +3697,27 @@ class NewsFeedMenu:
                 self.search_input_active = False
             elif key == "ESC":
                 self.is_search_view, self.search_query, self.search_input_active = False, "", False
+                self.search.cancel()
                 self.force_regenerate_view = True # Clear search
             elif key == "BACKSPACE":
                 self.search_query = self.search_query[:-1]
-                self.force_regenerate_view = True # Force regen on change
+                self.search_dirty = True # Re-widen from a cached ancestor
             elif len(key) == 1 and key.isprintable():
                 self.search_query += key
-                self.force_regenerate_view = True # Force regen on change
+                self.search_dirty = True # Narrow the previous result
         else:
             if key == '/': self.search_input_active = True
             elif key == "ESC":
                 self.is_search_view, self.search_query = False, ""
+                self.search.cancel()
                 self.force_regenerate_view = True # Clear search
             else: self.handle_main_view_input(key, items_data)
         self.needs_redraw = True
 
     def handle_main_view_input(self, key, items_data):
         """Handles all key presses for the main article list view."""
-        if not items_data and key not in ["ESC", "s", "v", "/", "h", "p"]: return
+        if not items_data and key not in ["ESC", "s", "v", "/", "h", "p", "f"]: return
+        self.selected_index = min(self.selected_index, max(0, len(items_data) - 1)) # A windowed view may have recounted since the draw
         original_index = self.selected_index
         if key == "UP": self.selected_index = max(0, self.selected_index - 1)
         elif key == "DOWN": self.selected_index = min(len(items_data) - 1, self.selected_index + 1)
@@ -1621,14 +3731,14 @@ class NewsFeedMenu:
             if items_data:
                 selected = items_data[self.selected_index]
                 new_status = not selected.get('is_bookmarked')
-                update_article_status(url=selected['url'], is_bookmarked=new_status)
+                ARTICLE_STATE_WRITER.queue(selected['url'], selected.get('db_path'), is_bookmarked=new_status)
                 selected['is_bookmarked'] = new_status
         elif key.lower() == 'm':
-            articles_marked = mark_all_as_seen_in_db()
+            if self.view_modes[self.current_view_mode_index] == self.CROSS_PROFILE_MODE: # Every profile's DB, not just the active one
+                articles_marked = sum(mark_all_as_seen_in_db(db_path) for db_path in dict.fromkeys(map(str, get_profile_databases().values())))
+            else: articles_marked = mark_all_as_seen_in_db()
             if articles_marked > 0:
-                for article in self.master_article_list:
-                    if article['is_new']:
-                        article['is_new'] = False
+                self.master_article_list.clear_flag(FLAG_NEW)
                 self.status_message = f"{articles_marked} new articles marked as seen."
                 self.force_regenerate_view = True
             else:
@@ -1637,19 +3747,21 @@ class NewsFeedMenu:
         
         elif key == "c":
             if items_data:
-                self.is_comment_view, self.comment_view_status = True, "Loading comments..."
-                threading.Thread(target=self._fetch_comments_threaded, args=(items_data[self.selected_index].get('permalink'),)).start()
+                self._open_comments(items_data[self.selected_index].get('permalink'))
         elif key == "s": self.is_settings_view = True
         elif key == "h": self.is_help_view = True
         elif key == "p": self.is_profile_view = True
+        elif key == "f": self.show_perf_overlay = not self.show_perf_overlay
         elif key == 'v':
             self.is_filter_menu_view = True
             self.filter_menu_selected_index = self.current_view_mode_index
-        elif key == '/': self.is_search_view, self.search_query, self.search_input_active = True, "", True
+        elif key == '/':
+            self.is_search_view, self.search_query, self.search_input_active = True, "", True
+            self.search_dirty = True
         elif key == "ENTER":
             if items_data:
                 self.is_action_menu_view, self.action_menu_article, self.action_menu_selected_index = True, items_data[self.selected_index], 0
-                update_article_status(url=self.action_menu_article['url'], is_read=True, is_new=False)
+                ARTICLE_STATE_WRITER.queue(self.action_menu_article['url'], self.action_menu_article.get('db_path'), is_read=True, is_new=False)
                 items_data[self.selected_index]['is_read'], items_data[self.selected_index]['is_new'] = True, False
         elif key == "ESC":
             if self.current_view_mode_index != 0:
@@ -1666,7 +3778,7 @@ class NewsFeedMenu:
                 newly_selected = items_data[self.selected_index]
                 if newly_selected.get('is_new'):
                     newly_selected['is_new'] = False
-                    update_article_status(url=newly_selected['url'], is_new=False)
+                    ARTICLE_STATE_WRITER.queue(newly_selected['url'], newly_selected.get('db_path'), is_new=False)
         self.needs_redraw = True
 
     def _draw_profile_manager(self, items_data):
@@ -1727,7 +3839,6 @@ class NewsFeedMenu:
 
     def handle_profile_input(self, key):
         """Handles key presses for the functional Profile Manager."""
-        global NEEDS_RESTART
         self.profile_status_message = ""
         if self.profile_input_active:
             if key == "ENTER":
@@ -1736,9 +3847,12 @@ class NewsFeedMenu:
                 if self.profile_action == 'create' and query:
                     self.profile_status_message = f"Profile '{query}' created." if create_profile(query) else f"Error: Profile '{query}' already exists."
                 elif self.profile_action == 'rename' and query:
-                    self.profile_status_message = f"Renamed to '{query}'." if rename_profile(selected_profile, query) else "Error: Could not rename."
+                    renamed = rename_profile(selected_profile, query)
+                    self.profile_status_message = f"Renamed to '{query}'." if renamed else "Error: Could not rename."
+                    if renamed and selected_profile == self.active_profile: self.pending_profile = query # Reopen under the new DB name
                 elif self.profile_action == 'edit' and query:
                     self.profile_status_message = f"Updated subreddits for '{selected_profile}'." if update_profile_subreddits(selected_profile, query) else "Error: Could not update."
+                    load_profile_settings(self.active_profile)
                 self.profile_input_active, self.profile_action, self.profile_input_query = False, None, ""
                 self.profiles = get_all_profiles()
             elif key == "ESC": self.profile_input_active, self.profile_action, self.profile_input_query = False, None, ""
@@ -1752,10 +3866,8 @@ class NewsFeedMenu:
                 if delete_profile(selected_profile):
                     # Check if the deleted profile was the one we are currently using
                     if selected_profile == self.active_profile:
-                        set_active_profile('Main')
-                        self.profile_status_message = "Active profile deleted. Switching to 'Main' and restarting..."
-                        NEEDS_RESTART = True
-                        self.is_running = False # Exit main loop to trigger restart
+                        self.pending_profile = 'Main'
+                        self.profile_status_message = "Active profile deleted. Switched to 'Main'."
                     else:
                         # If it wasn't the active profile, just update the list as normal
                         self.profile_status_message = f"Profile '{selected_profile}' deleted."
@@ -1771,9 +3883,8 @@ class NewsFeedMenu:
         elif key == "ESC": self.is_profile_view = False
         elif key == "ENTER":
             selected_profile = self.profiles[self.profile_selected_index]
-            set_active_profile(selected_profile)
-            self.profile_status_message = f"'{selected_profile}' is now active. Restarting..."
-            NEEDS_RESTART, self.is_running = True, False
+            if selected_profile != self.active_profile: self.pending_profile = selected_profile
+            self.profile_status_message = f"'{selected_profile}' is now active."
         elif key.lower() == 'n': self.profile_action, self.profile_input_active = 'create', True
         elif key.lower() == 'r':
             self.profile_action, self.profile_input_active = 'rename', True
@@ -1785,8 +3896,7 @@ class NewsFeedMenu:
             self.subreddit_profile_target = self.profiles[self.profile_selected_index]
 
             # Load current subreddits into the editor list
-            config = configparser.ConfigParser()
-            config.read(CONFIG_FILE)
+            config = CONFIG.config
             section = f"Profile:{self.subreddit_profile_target}"
             current_subs = config.get(section, 'subreddits', fallback='')
             self.subreddit_list = [s for s in current_subs.split('+') if s] # Filter out empty strings
@@ -1798,7 +3908,6 @@ class NewsFeedMenu:
 
     def handle_subreddit_edit_input(self, key):
         """Handles key presses for the subreddit editor."""
-        global NEEDS_RESTART
         # --- Handle text input mode first ---
         if self.subreddit_input_active:
             if key == "ENTER":
@@ -1833,48 +3942,304 @@ class NewsFeedMenu:
             # Save the changes and exit
             updated_subreddits = '+'.join(self.subreddit_list)
             update_profile_subreddits(self.subreddit_profile_target, updated_subreddits)
-            self.profile_status_message = f"Subreddits updated for '{self.subreddit_profile_target}'. Restarting..."
+            load_profile_settings(self.active_profile) # The fetcher reads the new subreddits on its next cycle
+            self.profile_status_message = f"Subreddits updated for '{self.subreddit_profile_target}'."
             self.is_subreddit_edit_view = False
             self.is_profile_view = True # Go back to the profile manager
-            NEEDS_RESTART = True
 
         self.needs_redraw = True
 
+# --- Export ---
+EXPORT_COLUMNS = ('url', 'title', 'subreddit', 'source_domain', 'permalink', 'created_utc',
+                  'is_read', 'is_bookmarked', 'is_new', 'score', 'num_comments')
+EXPORT_HTML_HEAD = """<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Alien News Feed {title}</title><style>body{{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,Helvetica,Arial,sans-serif;background-color:#1e1e1e;color:#d4d4d4;line-height:1.6;margin:0;padding:2em;}}.container{{max-width:800px;margin:0 auto;}}h1{{color:#569cd6;border-bottom:1px solid #444;padding-bottom:.5em;}}p{{color:#999;}}ul{{list-style-type:none;padding:0;}}li{{margin-bottom:1em;padding:1em;background-color:#252526;border-left:3px solid #569cd6;}}a{{color:#9cdcfe;text-decoration:none;}}a:hover{{text-decoration:underline;}}.meta{{font-size:.8em;color:#888;margin-left:.5em;}}</style></head><body><div class="container"><h1>👽 Alien News Feed {title}</h1><p>Exported on: {exported}</p><ul>\n"""
+
+def _export_html(f, rows, title):
+    f.write(EXPORT_HTML_HEAD.format(title=html.escape(title), exported=time.strftime('%Y-%m-%d %H:%M:%S')))
+    empty = True
+    for row in rows:
+        empty = False
+        f.write(f'<li><a href="{html.escape(row["url"])}">{html.escape(row["title"])}</a> '
+                f'<span class="meta">({html.escape(row["source_domain"] or "N/A")})</span></li>\n')
+    if empty: f.write("<li>No articles found.</li>\n")
+    f.write("</ul></div></body></html>\n")
+
+def _export_netscape(f, rows, title):
+    f.write("<!DOCTYPE NETSCAPE-Bookmark-file-1>\n<META HTTP-EQUIV=\"Content-Type\" CONTENT=\"text/html; charset=UTF-8\">\n"
+            f"<TITLE>{html.escape(title)}</TITLE>\n<H1>{html.escape(title)}</H1>\n<DL><p>\n")
+    for row in rows:
+        f.write(f'    <DT><A HREF="{html.escape(row["url"])}" ADD_DATE="{int(row["created_utc"])}" '
+                f'TAGS="{html.escape(row["subreddit"])}">{html.escape(row["title"])}</A>\n')
+    f.write("</DL><p>\n")
+
+def _export_jsonl(f, rows, title):
+    for row in rows: f.write(json.dumps(dict(row), ensure_ascii=False) + "\n")
+
+def _export_csv(f, rows, title):
+    import csv
+    writer = csv.writer(f)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows: writer.writerow(tuple(row))
+
+EXPORT_FORMATS = {'html': _export_html, 'netscape': _export_netscape, 'jsonl': _export_jsonl, 'csv': _export_csv}
+
+def export_articles(dest_path, fmt, mode="All", since=None, until=None, subreddits=(), domains=()):
+    """
+    Streams the articles of view `mode` (without the blocked-domain and mute
+    filters) to `dest_path` in format `fmt`, newest first, optionally limited to a
+    created_utc range and to some subreddits or domains. Rows go from the cursor
+    straight to the file, so memory stays flat; returns how many were written.
+    """
+    where, params = compile_view_query(mode, feed_filters=False)
+    clauses, params = [where] if where else [], list(params)
+    if since is not None: clauses.append("created_utc >= ?"); params.append(since)
+    if until is not None: clauses.append("created_utc < ?"); params.append(until)
+    if subreddits:
+        clauses.append(f"subreddit_id IN (SELECT id FROM subreddits WHERE name IN ({','.join('?' for _ in subreddits)}))")
+        params.extend(subreddits)
+    if domains:
+        clauses.append(f"domain_id IN (SELECT id FROM domains WHERE name IN ({','.join('?' for _ in domains)}))")
+        params.extend(domains)
+    ARTICLE_STATE_WRITER.flush()
+    dest_path = Path(dest_path)
+    partial_path = dest_path.with_name(f".{dest_path.name}.partial")
+    written = 0
+    def rows():
+        nonlocal written
+        for row in cursor:
+            written += 1
+            yield row
+    # A private cursor so the shared connection's other users keep their tuples
+    cursor = db_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.arraysize = 500
+    cursor.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM article_view {'WHERE ' + ' AND '.join(clauses) if clauses else ''} "
+                   "ORDER BY created_utc DESC, url DESC", params)
+    try:
+        with open(partial_path, 'w', encoding='utf-8', newline='') as f:
+            EXPORT_FORMATS[fmt](f, rows(), "Bookmarks" if mode == "Bookmarks" else f"{mode} Articles")
+        os.replace(partial_path, dest_path)
+    finally:
+        cursor.close()
+        partial_path.unlink(missing_ok=True)
+    return written
+
+def parse_export_date(text):
+    """Local midnight of a YYYY-MM-DD date, as a UTC timestamp."""
+    try: return time.mktime(time.strptime(text, '%Y-%m-%d'))
+    except ValueError: raise argparse.ArgumentTypeError(f"invalid date '{text}', expected YYYY-MM-DD")
+
 def export_bookmarks_to_html():
     backups_dir = CONFIG_DIR / "backups"
     backups_dir.mkdir(exist_ok=True)
     dest_path = backups_dir / f"bookmarks-{time.strftime('%Y%m%d')}.html"
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM articles WHERE is_bookmarked = 1 ORDER BY created_utc DESC")
-        bookmarks = [dict(row) for row in cursor.fetchall()]
-    li_items = "<li>No bookmarks found.</li>" if not bookmarks else "\n".join([f'<li><a href="{b["url"]}">{b["title"]}</a> <span class="meta">({b.get("source_domain", "N/A")})</span></li>' for b in bookmarks])
-    html_template = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Alien News Feed Bookmarks</title><style>body{{font-family:-apple-system,BlinkMacSystemFont,"Segoe UI",Roboto,Helvetica,Arial,sans-serif;background-color:#1e1e1e;color:#d4d4d4;line-height:1.6;margin:0;padding:2em;}}.container{{max-width:800px;margin:0 auto;}}h1{{color:#569cd6;border-bottom:1px solid #444;padding-bottom:.5em;}}p{{color:#999;}}ul{{list-style-type:none;padding:0;}}li{{margin-bottom:1em;padding:1em;background-color:#252526;border-left:3px solid #569cd6;}}a{{color:#9cdcfe;text-decoration:none;}}a:hover{{text-decoration:underline;}}.meta{{font-size:.8em;color:#888;margin-left:.5em;}}</style></head><body><div class="container"><h1>👽 Alien News Feed Bookmarks</h1><p>Exported on: {time.strftime('%Y-%m-%d %H:%M:%S')}</p><ul>{li_items}</ul></div></body></html>"""
-    with open(dest_path, 'w', encoding='utf-8') as f: f.write(html_template)
+    export_articles(dest_path, 'html', "Bookmarks")
     return dest_path
 
-def export_database():
+BACKUP_SUFFIXES = {None: "", 'gzip': ".gz", 'zstd': ".zst"}
+BACKUP_STATUS = "" # Footer text while a background backup runs and shortly after
+backup_thread = None
+
+def _open_backup_writer(path, compression):
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        import zstandard # Optional; only needed for zstd backups
+        return zstandard.ZstdCompressor(level=6).stream_writer(open(path, 'wb'))
+    return open(path, 'wb')
+
+def open_backup(path):
+    """Opens a backup file for reading, decompressing .gz and .zst backups on the fly."""
+    path = Path(path)
+    if path.suffix == '.gz':
+        import gzip
+        return gzip.open(path, 'rb')
+    if path.suffix == '.zst':
+        import zstandard
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+def backup_database(compression=None, progress=None, pages_per_step=256):
+    """
+    Copies the active profile's DB into the backups folder with the SQLite online
+    backup API, `pages_per_step` pages at a time, so the copy is consistent even
+    while the fetcher writes. Optionally compresses it, then prunes the folder down
+    to BACKUP_KEEP backups. `progress(fraction)` is called after every step.
+    """
     backups_dir = CONFIG_DIR / "backups"
     backups_dir.mkdir(exist_ok=True)
-    dest_path = backups_dir / f"backup-{time.strftime('%Y%m%d-%H%M%S')}.db"
+    dest_path = backups_dir / f"backup-{time.strftime('%Y%m%d-%H%M%S')}.db{BACKUP_SUFFIXES[compression]}"
+    snapshot_path = backups_dir / f".{dest_path.name}.snapshot"
+    partial_path = backups_dir / f".{dest_path.name}.partial"
+    ARTICLE_STATE_WRITER.flush()
     try:
-        shutil.copy(DB_FILE, dest_path)
-        print(f"Success! Backup saved to:\n{dest_path}")
-    except FileNotFoundError:
+        source, dest = db_connection(), sqlite3.connect(snapshot_path)
+        try:
+            # Pin one WAL snapshot for the whole copy; otherwise every commit by the fetcher restarts the backup
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(dest, pages=pages_per_step,
+                          progress=lambda status, remaining, total: progress and progress(1 - remaining / max(1, total)))
+            dest.execute("PRAGMA journal_mode=DELETE") # A single self-contained file, no -wal alongside
+        finally:
+            source.rollback()
+            dest.close()
+        if compression:
+            with open(snapshot_path, 'rb') as src, _open_backup_writer(partial_path, compression) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(partial_path, dest_path)
+        else: os.replace(snapshot_path, dest_path)
+    finally:
+        for leftover in (snapshot_path, partial_path): leftover.unlink(missing_ok=True)
+    rotate_backups(backups_dir, BACKUP_KEEP)
+    return dest_path
+
+def rotate_backups(backups_dir, keep):
+    """Deletes all but the newest `keep` full backups; 0 keeps everything."""
+    if keep <= 0: return
+    for old in sorted(backups_dir.glob("backup-*.db*"), reverse=True)[keep:]: old.unlink() # Timestamped names sort by age
+
+def backup_threaded():
+    """Runs backup_database for the UI, mirroring its progress into BACKUP_STATUS."""
+    def show(status):
+        global BACKUP_STATUS
+        BACKUP_STATUS = status
+        ARTICLES_UPDATED.set() # Wakes the UI for a redraw
+    try:
+        dest_path = backup_database(BACKUP_COMPRESSION, progress=lambda fraction: show(f"💾 Backup {fraction:.0%}"))
+        show(f"💾 Saved {dest_path.name}")
+    except (sqlite3.Error, OSError, ImportError) as e:
+        show(f"💾 Backup failed: {e}")
+    time.sleep(8)
+    show("")
+
+def start_background_backup():
+    """Starts a backup on a background thread; False if one is already running."""
+    global backup_thread
+    if backup_thread and backup_thread.is_alive(): return False
+    backup_thread = threading.Thread(target=backup_threaded, daemon=True)
+    backup_thread.start()
+    return True
+
+def export_database(compression=None):
+    def progress(fraction): print(f"\rBacking up... {fraction:.0%}", end='', flush=True)
+    if not split_db_path(DB_FILE)[0].is_file():
         print(f"Error: Database file not found at {DB_FILE}")
         sys.exit(1)
+    try:
+        dest_path = backup_database(compression, progress)
+        print(f"\nSuccess! Backup saved to:\n{dest_path}")
+    except (sqlite3.Error, OSError, ImportError) as e:
+        print(f"\nError: Backup failed: {e}")
+        sys.exit(1)
 
-def import_database(path_str, profile_name):
-    """Headless import of a database file to a specific profile with confirmation."""
+# Precedence when an article is in both DBs: read or bookmarked on either side wins, it stays new only if new on
+# both, engagement keeps the higher count, and everything else keeps the target's values. Tombstones from both
+# sides are unioned and always beat articles. Written as UPDATE plus INSERT OR IGNORE rather than an UPSERT so the
+# same statements run through the shared store's views.
+MERGE_UPDATE_SQL = '''
+    UPDATE articles SET (is_read, is_bookmarked, is_new, score, num_comments) = (
+        SELECT max(articles.is_read, src.is_read), max(articles.is_bookmarked, src.is_bookmarked), min(articles.is_new, src.is_new),
+               max(articles.score, src.score), max(articles.num_comments, src.num_comments)
+        FROM merge_source src WHERE src.url = articles.url)
+    WHERE url IN (SELECT url FROM merge_source)'''
+MERGE_INSERT_SQL = '''
+    INSERT OR IGNORE INTO articles (url, title, subreddit_id, domain_id, permalink, created_utc,
+                                    is_read, is_bookmarked, is_new, score, num_comments, canonical_url, fullname)
+    SELECT src.url, src.title, s.id, d.id, src.permalink, src.created_utc,
+           src.is_read, src.is_bookmarked, src.is_new, src.score, src.num_comments, canonicalize_url(src.url), reddit_fullname(src.permalink)
+    FROM merge_source src
+    JOIN subreddits s ON s.name = src.subreddit
+    JOIN domains d ON d.name = src.source_domain
+    WHERE src.url NOT IN (SELECT url FROM deleted_articles) AND src.url NOT IN (SELECT url FROM merge_tombstones)'''
+MERGE_SUMMARY_SQL = {
+    'backup articles': "SELECT COUNT(*) FROM merge_source",
+    'new articles': '''SELECT COUNT(*) FROM merge_source WHERE url NOT IN (SELECT url FROM articles)
+                       AND url NOT IN (SELECT url FROM deleted_articles) AND url NOT IN (SELECT url FROM merge_tombstones)''',
+    'already present': "SELECT COUNT(*) FROM merge_source src JOIN articles a ON a.url = src.url",
+    'bookmarks gained': "SELECT COUNT(*) FROM merge_source src JOIN articles a ON a.url = src.url WHERE src.is_bookmarked > a.is_bookmarked",
+    'marked read': "SELECT COUNT(*) FROM merge_source src JOIN articles a ON a.url = src.url WHERE src.is_read > a.is_read",
+    'skipped as deleted': '''SELECT COUNT(*) FROM merge_source WHERE url IN (SELECT url FROM deleted_articles)
+                             OR url IN (SELECT url FROM merge_tombstones)''',
+    'new tombstones': "SELECT COUNT(*) FROM merge_tombstones WHERE url NOT IN (SELECT url FROM deleted_articles)",
+    'removed by tombstones': "SELECT COUNT(*) FROM articles WHERE url IN (SELECT url FROM merge_tombstones)",
+}
+
+def _merge_source_sql(conn, profile):
+    """
+    SELECTs over the attached backup's articles (names resolved) and tombstones, for either
+    schema generation of a profile DB, or for `profile` in a backup of the shared store.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM backup.sqlite_master WHERE type = 'table'")}
+    if 'memberships' in tables:
+        row = conn.execute("SELECT id FROM backup.profiles WHERE name = ?", (profile,)).fetchone()
+        scope = row[0] if row else -1 # Inlined: views can't take bound parameters
+        return (f'''SELECT a.url, a.title, s.name AS subreddit, d.name AS source_domain, a.permalink, m.created_utc,
+                           m.is_read, m.is_bookmarked, m.is_new, a.score, a.num_comments
+                    FROM backup.memberships m JOIN backup.article_data a ON a.id = m.article_id
+                    JOIN backup.subreddits s ON s.id = a.subreddit_id JOIN backup.domains d ON d.id = a.domain_id
+                    WHERE m.profile_id = {scope}''',
+                f"SELECT url, deleted_utc FROM backup.profile_tombstones WHERE profile_id = {scope}")
+    columns = {c[1] for c in conn.execute("PRAGMA backup.table_info(articles)")}
+    optional = ', '.join(f"{c}" if c in columns else f"0 AS {c}" for c in ('score', 'num_comments'))
+    deleted_utc = 'deleted_utc' if 'deleted_utc' in {c[1] for c in conn.execute("PRAGMA backup.table_info(deleted_articles)")} else 'NULL AS deleted_utc'
+    tombstones = f"SELECT url, {deleted_utc} FROM backup.deleted_articles"
+    if 'subreddit_id' in columns:
+        return (f'''SELECT a.url, a.title, s.name AS subreddit, d.name AS source_domain, a.permalink, a.created_utc,
+                           a.is_read, a.is_bookmarked, a.is_new, {optional}
+                    FROM backup.articles a JOIN backup.subreddits s ON s.id = a.subreddit_id JOIN backup.domains d ON d.id = a.domain_id''',
+                tombstones)
+    return (f'''SELECT url, title, COALESCE(subreddit, '') AS subreddit, COALESCE(source_domain, '') AS source_domain, permalink,
+                       created_utc, is_read, is_bookmarked, is_new, {optional} FROM backup.articles''', tombstones)
+
+def merge_backup_into(db_path, backup_path, dry_run=False, replace=False, profile=None):
+    """
+    Merges the articles and tombstones of the backup at `backup_path` into the
+    DB at `db_path` in one transaction, entirely inside SQLite, following the
+    precedence rules above. `replace` empties the target first; `profile` picks
+    the profile to read from a backup of the shared store. Returns a summary of
+    what the merge does (or, with `dry_run`, would do).
+    """
+    conn = db_connection(db_path)
+    conn.execute("ATTACH DATABASE ? AS backup", (str(backup_path),))
+    try:
+        source_sql, tombstones_sql = _merge_source_sql(conn, profile or split_db_path(db_path)[1])
+        conn.execute(f"CREATE TEMP VIEW merge_source AS {source_sql}")
+        conn.execute(f"CREATE TEMP VIEW merge_tombstones AS {tombstones_sql}")
+        conn.execute("BEGIN IMMEDIATE") # Summary and writes see the same target
+        try:
+            summary = {name: conn.execute(sql).fetchone()[0] for name, sql in MERGE_SUMMARY_SQL.items()}
+            if not dry_run:
+                if replace:
+                    conn.execute("DELETE FROM articles")
+                    conn.execute("DELETE FROM deleted_articles")
+                conn.execute("INSERT OR IGNORE INTO subreddits (name) SELECT DISTINCT subreddit FROM merge_source")
+                conn.execute("INSERT OR IGNORE INTO domains (name) SELECT DISTINCT source_domain FROM merge_source")
+                conn.execute(MERGE_UPDATE_SQL)
+                conn.execute(MERGE_INSERT_SQL)
+                conn.execute("INSERT OR IGNORE INTO deleted_articles (url, deleted_utc) SELECT url, COALESCE(deleted_utc, ?) FROM merge_tombstones", (time.time(),))
+                conn.execute("DELETE FROM articles WHERE url IN (SELECT url FROM merge_tombstones)")
+            if dry_run: conn.rollback()
+            else: conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DROP VIEW IF EXISTS temp.merge_source")
+            conn.execute("DROP VIEW IF EXISTS temp.merge_tombstones")
+    finally: conn.execute("DETACH DATABASE backup")
+    return summary
+
+def import_database(path_str, profile_name, merge=False, dry_run=False):
+    """Headless import of a database file to a specific profile with confirmation; `merge` keeps the current articles."""
     backup_path = Path(path_str)
     if not backup_path.is_file():
         print(f"Error: Backup file not found at '{backup_path}'")
         sys.exit(1)
 
     # Find the target database file based on the profile name
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = CONFIG.config
     section_name = f"Profile:{profile_name}"
 
     if not config.has_section(section_name):
@@ -1886,7 +4251,10 @@ def import_database(path_str, profile_name):
         print(f"Error: DatabaseFile not configured for profile '{profile_name}'.")
         sys.exit(1)
 
-    target_db_path = CONFIG_DIR / db_filename
+    target_db_path = shared_store_path(profile_name) if SHARED_ARTICLE_STORE else CONFIG_DIR / db_filename
+    if merge:
+        merge_import(backup_path, target_db_path, profile_name, dry_run)
+        return
 
     # Display a specific and clear warning message
     print("--- ⚠️ WARNING ---")
@@ -1895,65 +4263,309 @@ def import_database(path_str, profile_name):
     print(f"Importing from: {backup_path}")
     confirm = input("Are you sure you want to continue? (y/n): ").lower().strip()
 
-    if confirm in ['y', 'yes']:
-        shutil.copy(backup_path, target_db_path)
+    if confirm in ['y', 'yes'] and SHARED_ARTICLE_STORE: # Other profiles share the file; only this one's rows are replaced
+        init_db(target_db_path)
+        attach_path, temp_path = plain_backup_path(backup_path, target_db_path)
+        try: merge_backup_into(target_db_path, attach_path, replace=True, profile=profile_name)
+        finally:
+            if temp_path: temp_path.unlink(missing_ok=True)
+        print("Import successful. Starting application...")
+    elif confirm in ['y', 'yes']:
+        close_db_connections(target_db_path)
+        with open_backup(backup_path) as src, open(target_db_path, 'wb') as dst: shutil.copyfileobj(src, dst, 1 << 20)
+        init_db(target_db_path) # Older backups still carry text subreddit/domain columns
         print("Import successful. Starting application...")
     else:
         print("Import cancelled.")
         sys.exit(0)
 
+def plain_backup_path(backup_path, target_db_path):
+    """Returns (path to ATTACH, temp file to delete afterwards or None) for a possibly compressed backup."""
+    if backup_path.suffix not in ('.gz', '.zst'): return backup_path, None
+    temp_path = split_db_path(target_db_path)[0].with_name(f".merge-{os.getpid()}.db") # ATTACH needs a plain file; decompress next to the target
+    with open_backup(backup_path) as src, open(temp_path, 'wb') as dst: shutil.copyfileobj(src, dst, 1 << 20)
+    return temp_path, temp_path
+
+def merge_import(backup_path, target_db_path, profile_name, dry_run=False):
+    """Headless merge of a backup into a profile's DB: prints the summary, then merges after confirmation."""
+    init_db(target_db_path)
+    attach_path, temp_path = plain_backup_path(backup_path, target_db_path)
+    try:
+        print(f"Merging {backup_path} into the '{profile_name}' profile ({target_db_path})")
+        summary = merge_backup_into(target_db_path, attach_path, dry_run=True, profile=profile_name)
+        for name, count in summary.items(): print(f"  {name:<22}{count:>10}")
+        if dry_run:
+            print("Dry run: nothing was changed.")
+            sys.exit(0)
+        if input("Merge these changes? (y/n): ").lower().strip() not in ['y', 'yes']:
+            print("Import cancelled.")
+            sys.exit(0)
+        merge_backup_into(target_db_path, attach_path, profile=profile_name)
+        print("Merge successful. Starting application...")
+    finally:
+        if temp_path: temp_path.unlink(missing_ok=True)
+
+# --- Benchmarks ---
+SYNTHETIC_SUBREDDITS = ["news", "worldnews", "politics", "technology", "science", "europe", "business",
+                        "economics", "geopolitics", "UpliftingNews", "nottheonion", "space", "environment",
+                        "canada", "australia", "unitedkingdom", "india", "energy", "Futurology", "health"]
+SYNTHETIC_WORDS = ("report says government plans new deal after talks over climate market record court "
+                   "ruling election vote minister warns crisis energy prices rise fall study finds scientists "
+                   "company announces launch war peace border city police officials data privacy ai chips").split()
+
+def generate_synthetic_db(db_path, count, seed=0, skew=1.0, domain_count=2000, read_ratio=0.3, new_ratio=0.05,
+                          bookmark_ratio=0.01, tombstones=0, batch_size=10000):
+    """
+    Writes `count` realistic-looking articles into a fresh profile DB at
+    `db_path`, about one every 45 seconds going back from now. Subreddits and
+    domains follow a Zipf distribution (a larger `skew` piles more articles on
+    the top few), each article is read, new and bookmarked with the given odds,
+    and `tombstones` deleted-article records are added. Choices are drawn a
+    batch at a time, so millions of rows take minutes, not hours.
+    """
+    import random, itertools
+    rng = random.Random(seed)
+    domains = [f"{rng.choice(['the', 'daily', 'global', 'news', 'metro'])}{rng.choice(['times', 'post', 'wire', 'herald', 'news'])}{i}.com" for i in range(domain_count)]
+    domain_weights = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(len(domains))))
+    sub_weights = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(len(SYNTHETIC_SUBREDDITS))))
+    init_db(db_path)
+    created = time.time()
+    with db_connection(db_path) as conn:
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            batch_domains = rng.choices(domains, cum_weights=domain_weights, k=size)
+            batch_subs = rng.choices(SYNTHETIC_SUBREDDITS, cum_weights=sub_weights, k=size)
+            batch = []
+            for i, domain, sub in zip(range(start, start + size), batch_domains, batch_subs):
+                created -= rng.expovariate(1 / 45)
+                title = ' '.join(rng.choices(SYNTHETIC_WORDS, k=rng.randint(6, 16))).capitalize()
+                post_id = f"{i:07x}"
+                batch.append((f"https://www.{domain}/{created:.0f}/{post_id}-{title[:40].replace(' ', '-').lower()}",
+                               title, sub, domain, f"/r/{sub}/comments/{post_id}/", created,
+                               int(rng.random() < read_ratio), int(rng.random() < bookmark_ratio), int(rng.random() < new_ratio),
+                               rng.randint(0, 5000), rng.randint(0, 800)))
+            insert_articles(conn, batch)
+        now = time.time()
+        conn.executemany("INSERT OR IGNORE INTO deleted_articles (url, deleted_utc) VALUES (?, ?)",
+                         ((f"https://www.{rng.choice(domains)}/deleted/{i:07x}", now - rng.uniform(0, 30 * 86400)) for i in range(tombstones)))
+        conn.commit()
+
+BENCH_QUERIES = ("court", "ai chips", "no-such-word")
+
+def benchmark_data_layer(db_path=None, count=200000, repeats=3, json_path=None, **synthetic):
+    """
+    Times the data layer on a copy of `db_path`, or on a synthetic DB of `count`
+    articles made with the `synthetic` options of generate_synthetic_db: loading,
+    every view mode (in memory and windowed), search, ingest, mark-all-as-seen
+    and each export format. Prints the best and median of `repeats` runs, writes
+    every run to `json_path` as JSON so runs can be compared, and returns them.
+    """
+    global DB_FILE
+    import tempfile, platform
+    results = {}
+    def bench(name, fn, setup=None):
+        runs = []
+        for _ in range(repeats):
+            if setup: setup()
+            started = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - started)
+        results[name] = {"best_s": min(runs), "median_s": sorted(runs)[len(runs) // 2], "runs_s": runs}
+        print(f"{name:<34}{min(runs) * 1000:>12.1f}{sorted(runs)[len(runs) // 2] * 1000:>12.1f}")
+    def first_screen(items): # What a redraw reads: the length and one screenful
+        return [items[i] for i in range(min(50, len(items)))]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_db = Path(tmp_dir) / "bench.db"
+        if db_path is None:
+            print(f"Generating {count} synthetic articles...")
+            generate_synthetic_db(bench_db, count, **synthetic)
+        else:
+            src, dst = sqlite3.connect(db_path), sqlite3.connect(bench_db)
+            try: src.backup(dst) # Benchmarks write, so they run on a copy
+            finally: src.close(); dst.close()
+            init_db(bench_db)
+        saved_db_file, DB_FILE = DB_FILE, bench_db
+        try:
+            rows = count_articles()
+            print(f"{rows} articles, {bench_db.stat().st_size / 2**20:.1f} MiB; best and median of {repeats} runs")
+            print(f"{'benchmark':<34}{'best ms':>12}{'median ms':>12}")
+            bench("get_articles_from_db", get_articles_from_db)
+            bench("load_article_store", load_article_store)
+            store = load_article_store()
+            for mode in NewsFeedMenu.VIEW_MODES:
+                bench(f"view.{mode}.memory", lambda mode=mode: len(filter_store_view(store, mode)))
+                bench(f"view.{mode}.windowed", lambda mode=mode: first_screen(WindowedArticleList(*compile_view_query(mode))))
+            bench(f"view.{NewsFeedMenu.CROSS_PROFILE_MODE}", lambda: first_screen(CrossProfileTimeline({"bench": str(bench_db)})))
+            all_view = filter_store_view(store, "All")
+            for query in BENCH_QUERIES:
+                bench(f"search.{query}.memory", lambda query=query: len(all_view.matching(query, lambda: False)))
+                bench(f"search.{query}.windowed", lambda query=query: first_screen(WindowedArticleList(*compile_view_query("All")).search(query)))
+            ingested = iter(range(10**9))
+            def fresh_articles(n):
+                now = time.time()
+                return [{'url': f"https://bench.example/{next(ingested)}", 'title': "Benchmark article", 'subreddit': "news",
+                         'created_utc': now, 'permalink': "/r/news/comments/bench/", 'score': 1, 'num_comments': 0} for _ in range(n)]
+            deleted_urls = {row[0] for row in db_connection().execute("SELECT url FROM deleted_articles")}
+            def fetch_cycle(): # The fetcher's path: one transaction per article
+                for article in fresh_articles(50): add_article_to_db(article, deleted_urls)
+            bench("ingest.fetch_cycle_50", fetch_cycle)
+            def insert_batch():
+                with db_connection() as conn:
+                    insert_articles(conn, [(a['url'], a['title'], a['subreddit'], "bench.example", a['permalink'], a['created_utc'], 0, 0, 1, 1, 0)
+                                           for a in fresh_articles(1000)])
+            bench("ingest.batch_1000", insert_batch)
+            def unsee_some():
+                with db_connection() as conn: conn.execute("UPDATE articles SET is_new = 1 WHERE rowid % 20 = 0")
+            bench("mark_all_as_seen_in_db", mark_all_as_seen_in_db, setup=unsee_some)
+            for fmt in sorted(EXPORT_FORMATS):
+                bench(f"export.{fmt}", lambda fmt=fmt: export_articles(Path(tmp_dir) / f"export.{fmt}", fmt))
+            db_bytes = bench_db.stat().st_size
+        finally:
+            DB_FILE = saved_db_file
+            close_db_connections(bench_db)
+    report = {"generated_at": time.strftime('%Y-%m-%dT%H:%M:%S'), "python": platform.python_version(),
+              "sqlite": sqlite3.sqlite_version, "platform": platform.platform(), "source": str(db_path) if db_path else "synthetic",
+              "synthetic": None if db_path else {"count": count, **synthetic}, "rows": rows, "db_bytes": db_bytes,
+              "repeats": repeats, "results": results}
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2)
+        print(f"Results written to {json_path}")
+    return report
+
+def benchmark_article_memory(db_path=None, count=200000):
+    """Compares memory and load time of the list-of-dicts and columnar article models."""
+    import gc, tempfile, tracemalloc
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if db_path is None:
+            db_path = Path(tmp_dir) / "bench.db"
+            print(f"Generating {count} synthetic articles...")
+            generate_synthetic_db(db_path, count)
+        results = {}
+        for name, loader in (("list of dicts", get_articles_from_db), ("columnar store", load_article_store)):
+            gc.collect()
+            tracemalloc.start()
+            started = time.perf_counter()
+            data = loader(db_path)
+            elapsed = time.perf_counter() - started
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {"rows": len(data), "retained_bytes": retained, "peak_bytes": peak, "load_seconds": elapsed}
+            del data
+        close_db_connections(db_path)
+    print(f"{'model':<16}{'rows':>10}{'retained MiB':>14}{'peak MiB':>10}{'bytes/row':>11}{'load s':>9}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['rows']:>10}{r['retained_bytes'] / 2**20:>14.1f}{r['peak_bytes'] / 2**20:>10.1f}"
+              f"{r['retained_bytes'] / max(1, r['rows']):>11.0f}{r['load_seconds']:>9.2f}")
+    return results
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="A terminal-based news feed reader.")
     parser.add_argument('--export', action='store_true', help="Export a full backup of the database and exit.")
+    parser.add_argument('--export-articles', dest='export_articles_path', metavar='FILE', help="Stream articles to FILE (HTML, Netscape bookmarks, JSONL or CSV) and exit.")
+    parser.add_argument('--format', dest='export_format', choices=sorted(EXPORT_FORMATS), help="Format for --export-articles (defaults to the file extension).")
+    parser.add_argument('--view', dest='export_view', default="All", choices=NewsFeedMenu.VIEW_MODES, help="View mode to export with --export-articles.")
+    parser.add_argument('--since', type=parse_export_date, metavar='YYYY-MM-DD', help="Only export articles created on or after this date.")
+    parser.add_argument('--until', type=parse_export_date, metavar='YYYY-MM-DD', help="Only export articles created before this date.")
+    parser.add_argument('--subreddit', dest='export_subreddits', action='append', default=[], metavar='NAME', help="Only export articles from this subreddit (repeatable).")
+    parser.add_argument('--domain', dest='export_domains', action='append', default=[], metavar='DOMAIN', help="Only export articles from this domain (repeatable).")
+    parser.add_argument('--compress', choices=['none', 'gzip', 'zstd'], help="Compression for --export (defaults to BackupCompression in config.ini).")
     parser.add_argument('--import', dest='import_path', metavar='PATH', help="Import a database from the specified path and start the app.")
+    parser.add_argument('--merge', action='store_true', help="With --import, merge the backup into the profile's database instead of overwriting it.")
+    parser.add_argument('--dry-run', action='store_true', help="With --import --merge, print what the merge would change and exit.")
     parser.add_argument('--profile', dest='profile_name', metavar='NAME', help="Specify a profile to import the database into (defaults to active profile).")
+    parser.add_argument('--bench-memory', dest='bench_memory', nargs='?', const='', metavar='DB', help="Compare in-memory article models on DB (or a synthetic 200k-article DB) and exit.")
+    parser.add_argument('--bench', dest='bench_db', nargs='?', const='', metavar='DB', help="Benchmark the data layer on a copy of DB (or a synthetic DB), print the timings and write them as JSON, then exit.")
+    parser.add_argument('--bench-json', dest='bench_json', metavar='FILE', help="Where --bench writes its JSON results (defaults to bench-<time>.json in the config directory).")
+    parser.add_argument('--bench-repeat', dest='bench_repeat', type=int, default=3, metavar='N', help="How many times --bench runs each benchmark.")
+    parser.add_argument('--generate-db', dest='generate_db', metavar='PATH', help="Write a synthetic profile DB of --bench-rows articles to PATH and exit.")
+    parser.add_argument('--bench-rows', dest='bench_rows', type=int, default=200000, metavar='N', help="Number of synthetic articles to generate for benchmarks and --generate-db.")
+    parser.add_argument('--bench-skew', dest='bench_skew', type=float, default=1.0, metavar='S', help="Zipf exponent of the synthetic subreddit and domain distributions.")
+    parser.add_argument('--bench-bookmarks', dest='bench_bookmarks', type=float, default=0.01, metavar='RATIO', help="Share of synthetic articles that are bookmarked.")
+    parser.add_argument('--bench-tombstones', dest='bench_tombstones', type=int, default=0, metavar='N', help="Number of deleted-article records in a synthetic DB.")
+    parser.add_argument('--explain-views', action='store_true', help="Print the query plan of every view mode for the active profile and exit.")
+    parser.add_argument('--compact', action='store_true', help="Apply the profile's retention policy, reclaim free space and exit.")
+    parser.add_argument('--log-slow-queries', dest='slow_query_ms', type=float, metavar='MS', help="Append SQL statements slower than MS milliseconds to slow_queries.log in the config directory.")
+    parser.add_argument('--trace-ui', dest='trace_ui_path', metavar='FILE', help="Write every UI timing sample (key handling, regeneration, draw, flush, DB, key-to-frame latency) to FILE as JSON lines.")
+    parser.add_argument('--profile-run', action='store_true', help="Profile the session's CPU time (all threads) and allocations; the reports are written to the config directory on exit.")
+    parser.add_argument('--startup-trace', action='store_true', help="Start the UI, quit once all articles are loaded and print how long each startup phase took.")
     args = parser.parse_args()
+    SLOW_QUERY_MS = args.slow_query_ms
+    if args.startup_trace: STARTUP_PHASES = []
+    trace_startup("imports and args")
+    if args.bench_memory is not None:
+        benchmark_article_memory(args.bench_memory or None, args.bench_rows)
+        sys.exit(0)
+    synthetic = {'skew': args.bench_skew, 'bookmark_ratio': args.bench_bookmarks, 'tombstones': args.bench_tombstones}
+    if args.generate_db:
+        if Path(args.generate_db).exists(): sys.exit(f"{args.generate_db} already exists.")
+        generate_synthetic_db(args.generate_db, args.bench_rows, **synthetic)
+        close_db_connections(args.generate_db)
+        print(f"Wrote {args.bench_rows} synthetic articles to {args.generate_db}")
+        sys.exit(0)
+    if args.bench_db is not None:
+        json_path = args.bench_json or CONFIG_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        benchmark_data_layer(args.bench_db or None, args.bench_rows, args.bench_repeat, json_path, **synthetic)
+        sys.exit(0)
     pid_file = pid.PidFile(pidname='aliennewsfeed', piddir=CONFIG_DIR)
 
-    NEEDS_RESTART = True
-    fetch_thread = None
-
-    while NEEDS_RESTART:
-        NEEDS_RESTART = False
-        if fetch_thread:
-            stop_thread_event.set()
-            fetch_thread.join()
-            stop_thread_event.clear()
-
-        setup_config()
-        theme_name, active_profile = load_profile_settings()
-        init_db(DB_FILE)
-
-        if args.export:
-            export_database()
-            sys.exit(0)
-        if args.import_path:
-            # If --profile is specified, use it. Otherwise, use the active profile.
-            target_profile = args.profile_name if args.profile_name else active_profile
-            import_database(args.import_path, target_profile)
-            # Prevent the import from running again if the app restarts
-            args.import_path = None
-
-        print(f"Initializing AlienNewsFeed...")
-        print(f"Config and database stored in: {CONFIG_DIR}")
-
-        fetch_thread = threading.Thread(target=fetch_articles_threaded, daemon=True)
-        fetch_thread.start()
+    setup_config()
+    theme_name, active_profile = load_profile_settings()
+    trace_startup("config")
+    init_db(DB_FILE)
+    sync_blocked_domains()
+    trace_startup("database")
 
-        time.sleep(1)
-        menu = NewsFeedMenu(active_profile)
+    if args.export:
+        export_database(BACKUP_COMPRESSION if args.compress is None else None if args.compress == 'none' else args.compress)
+        sys.exit(0)
+    if args.export_articles_path:
+        path = Path(args.export_articles_path)
+        fmt = args.export_format or {'.jsonl': 'jsonl', '.csv': 'csv'}.get(path.suffix.lower(), 'html')
+        count = export_articles(path, fmt, args.export_view, args.since, args.until, args.export_subreddits, args.export_domains)
+        print(f"Exported {count} articles to {path}")
+        sys.exit(0)
+    if args.compact:
+        print(format_compaction_report(compact_database(pause=0)))
+        sys.exit(0)
+    if args.explain_views:
+        sys.exit(0 if explain_view_queries(NewsFeedMenu.VIEW_MODES) else 1)
+    if args.import_path:
+        # If --profile is specified, use it. Otherwise, use the active profile.
+        target_profile = args.profile_name if args.profile_name else active_profile
+        import_database(args.import_path, target_profile, merge=args.merge, dry_run=args.dry_run)
+
+    session_profiler = SessionProfiler(CONFIG_DIR) if args.profile_run else None
+    if session_profiler: session_profiler.start()
+
+    # The threads follow profile switches themselves, so they run once for the whole session
+    fetch_thread = threading.Thread(target=fetch_articles_threaded, daemon=True)
+    fetch_thread.start()
+    compaction_thread = threading.Thread(target=compaction_threaded, daemon=True)
+    compaction_thread.start()
+    engagement_thread = threading.Thread(target=engagement_refresh_threaded, daemon=True)
+    engagement_thread.start()
+    trace_startup("threads")
+
+    if args.trace_ui_path: UI_STATS.trace_file = open(args.trace_ui_path, 'w', encoding='utf-8')
+    sys.stdout = _TimedStdout(sys.stdout)
+    menu = NewsFeedMenu(active_profile)
+    trace_startup("menu")
 
-        try:
-            with pid_file:
-                menu.show()
-        except pid.PidFileAlreadyLockedError:
-            print("Another instance of Alien News Feed is already running. Exiting.")
-            sys.exit(1)
-        finally:
-            if not NEEDS_RESTART:
-                stop_thread_event.set()
-                if fetch_thread:
-                    fetch_thread.join()
-                os.system('cls' if os.name == 'nt' else 'clear')
-                print("Exiting.")
-                os._exit(0)
+    try:
+        with pid_file:
+            menu.show()
+    except pid.PidFileAlreadyLockedError:
+        print("Another instance of Alien News Feed is already running. Exiting.")
+        sys.exit(1)
+    finally:
+        ARTICLE_STATE_WRITER.flush()
+        UI_STATS.close()
+        stop_thread_event.set()
+        fetch_thread.join()
+        reports = session_profiler.stop() if session_profiler else ()
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print("Exiting.")
+        if STARTUP_PHASES: print(format_startup_trace())
+        for path in reports: print(f"Profile written to {path}")
+        os._exit(0)
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["HOME"] = os.environ["APPDATA"] = tempfile.mkdtemp() # alien creates its config directory on import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import alien
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://example.com/story?utm_source=tw&utm_medium=social&fbclid=abc", "https://example.com/story"),
+    ("https://example.com/story?id=7&gclid=x&utm_campaign=y", "https://example.com/story?id=7"),
+    ("https://example.com/search?b=2&a=1#comments", "https://example.com/search?a=1&b=2"),
+    ("https://www.example.com/story", "https://example.com/story"),
+    ("https://m.example.com/story", "https://example.com/story"),
+    ("https://amp.example.com/story", "https://example.com/story"),
+    ("https://www.com/story", "https://www.com/story"), # The prefix is the whole domain
+    ("https://www.google.com/amp/s/www.example.com/story", "https://example.com/story"),
+    ("https://www-example-com.cdn.ampproject.org/c/s/www.example.com/story", "https://example.com/story"),
+    ("https://example.com/amp/story", "https://example.com/story"),
+    ("https://example.com/story/amp", "https://example.com/story"),
+    ("https://example.com/story.amp.html", "https://example.com/story.html"),
+    ("https://example.com/story.amp", "https://example.com/story"),
+    ("http://example.com/story", "https://example.com/story"),
+    ("https://EXAMPLE.com/story", "https://example.com/story"),
+    ("https://example.com/story/", "https://example.com/story"),
+    ("https://example.com/", "https://example.com"),
+    ("https://example.com:8080/story", "https://example.com:8080/story"),
+    ("https://example.com:443/story", "https://example.com/story"),
+    ("http://example.com:80/story", "https://example.com/story"),
+    ("mailto:editor@example.com", "mailto:editor@example.com"),
+    ("ftp://example.com/story/", "ftp://example.com/story/"),
+    ("https://example.com:port/story", "https://example.com:port/story"), # Unparseable port
+])
+def test_canonicalize_url(url, canonical):
+    assert alien.canonicalize_url(url) == canonical
+
+
+def test_migration_merges_duplicates(tmp_path):
+    db_path = tmp_path / "news_feed_test.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        CREATE TABLE subreddits (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE domains (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, blocked INTEGER NOT NULL DEFAULT 0);
+        INSERT INTO subreddits (id, name) VALUES (1, 'news'), (2, 'worldnews'), (3, 'europe');
+        INSERT INTO domains (id, name) VALUES (1, 'example.com');
+        CREATE TABLE articles (
+            url TEXT PRIMARY KEY, title TEXT NOT NULL, subreddit_id INTEGER NOT NULL, domain_id INTEGER NOT NULL,
+            permalink TEXT, created_utc REAL NOT NULL, is_read INTEGER DEFAULT 0, is_bookmarked INTEGER DEFAULT 0,
+            is_new INTEGER DEFAULT 0, score INTEGER DEFAULT 0, num_comments INTEGER DEFAULT 0);
+        CREATE TABLE deleted_articles (url TEXT PRIMARY KEY, deleted_utc REAL);
+        INSERT INTO articles VALUES
+            ('https://example.com/story', 'Story', 1, 1, '/p1', 100, 0, 0, 1, 10, 3),
+            ('http://www.example.com/story/?utm_source=x', 'Story', 2, 1, '/p2', 200, 1, 0, 0, 4, 9),
+            ('https://m.example.com/story', 'Story', 3, 1, '/p3', 300, 0, 1, 1, 2, 1),
+            ('https://example.com/other', 'Other', 1, 1, '/p4', 150, 0, 0, 1, 0, 0);
+        INSERT INTO deleted_articles VALUES ('http://www.example.com/gone?fbclid=1', 50);
+    ''')
+    conn.commit()
+    conn.close()
+    alien.init_db(db_path)
+    conn = alien.db_connection(db_path)
+    try:
+        rows = conn.execute("SELECT url, is_read, is_bookmarked, is_new, score, num_comments FROM articles ORDER BY url").fetchall()
+        assert rows == [("https://example.com/other", 0, 0, 1, 0, 0), ("https://example.com/story", 1, 1, 0, 10, 9)]
+        subreddits = conn.execute('''SELECT s.name FROM article_subreddits x JOIN subreddits s ON s.id = x.subreddit_id
+                                     WHERE x.url = 'https://example.com/story' ORDER BY s.name''').fetchall()
+        assert subreddits == [("europe",), ("worldnews",)]
+        assert conn.execute("SELECT 1 FROM deleted_articles WHERE url = 'https://example.com/gone'").fetchone()
+    finally: alien.close_db_connections()
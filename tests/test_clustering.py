@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["HOME"] = os.environ["APPDATA"] = tempfile.mkdtemp() # alien creates its config directory on import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import alien
+
+HEADLINES = [
+    ("https://a.com/quake", "Magnitude 7.1 earthquake strikes off the coast of Japan"),
+    ("https://b.com/quake", "Magnitude 7.1 earthquake strikes off coast of Japan, tsunami warning issued"),
+    ("https://c.com/quake", "Japan's coast hit by magnitude 7.1 earthquake"),
+    ("https://d.com/budget", "Senate passes budget bill after late-night vote"),
+    ("https://e.com/chips", "Chipmaker unveils new processor for data centers"),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    db_path = tmp_path / "news_feed_test.db"
+    monkeypatch.setattr(alien, "DB_FILE", db_path)
+    alien.init_db(db_path)
+    yield db_path
+    alien.close_db_connections()
+
+
+def add_headlines(conn, headlines, created_utc):
+    with conn:
+        alien.insert_articles(conn, [(url, title, "news", url.split("/")[2], "/p", created_utc, 0, 0, 1, 0, 0) for url, title in headlines])
+        return alien.cluster_articles(conn, [(url, title, created_utc + i) for i, (url, title) in enumerate(headlines)])
+
+
+def test_title_tokens():
+    assert alien.title_tokens("The Senate's budgets pass") == {"senate", "budget", "pass"}
+    assert alien.title_tokens("Glass U.S. it's") == {"glass", "u.s"}
+    assert alien.title_tokens("") == set()
+
+
+def test_lsh_keys_are_stable():
+    tokens = alien.title_tokens(HEADLINES[0][1])
+    keys = alien.lsh_keys(tokens)
+    assert keys == alien.lsh_keys(set(sorted(tokens))) and len(keys) == alien.CLUSTER_BANDS
+    assert all(0 <= key < 1 << 63 for _, key in keys) # Fits SQLite's INTEGER
+    assert keys != alien.lsh_keys(alien.title_tokens(HEADLINES[3][1]))
+
+
+def test_near_duplicates_join_a_story(db_path):
+    conn = alien.db_connection(db_path)
+    assert add_headlines(conn, HEADLINES, time.time() - 60) == 2
+    assert alien.load_stories(db_path) == {"https://a.com/quake": ["https://b.com/quake", "https://c.com/quake"]}
+    clustered = {url for (url,) in conn.execute("SELECT url FROM article_clusters")}
+    assert clustered.isdisjoint({"https://d.com/budget", "https://e.com/chips"})
+
+
+def test_stories_past_the_window_are_not_loaded(db_path):
+    conn = alien.db_connection(db_path)
+    add_headlines(conn, HEADLINES[:2], time.time() - alien.CLUSTER_WINDOW_HOURS * 3600 - 60)
+    add_headlines(conn, HEADLINES[3:4], time.time()) # Prunes the buckets of the old story
+    assert conn.execute("SELECT count(*) FROM article_clusters").fetchone() == (1,)
+    assert alien.load_stories(db_path) == {}
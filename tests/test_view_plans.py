@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["HOME"] = os.environ["APPDATA"] = tempfile.mkdtemp() # alien creates its config directory on import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import alien
+
+SEED_ROWS = 3000
+DOMAINS = ["youtube.com", "youtu.be", "vimeo.com"] + [f"site{i}.com" for i in range(40)]
+SUBREDDITS = ["news", "worldnews", "technology", "politics", "science"]
+
+
+def seed_articles(conn):
+    now = time.time()
+    rows = [(f"https://{DOMAINS[i % len(DOMAINS)]}/a/{i}", f"Headline number {i} about topic {i % 97}",
+             SUBREDDITS[i % len(SUBREDDITS)], DOMAINS[i % len(DOMAINS)], f"/r/news/comments/x{i}/t/",
+             now - i * 45, int(i % 3 == 0), int(i % 50 == 0), int(i % 20 == 0), i % 500, i % 40) for i in range(SEED_ROWS)]
+    with conn:
+        alien.insert_articles(conn, rows)
+        alien.cluster_articles(conn, [(f"https://dup{i}.com/story", "Magnitude 7.1 earthquake strikes off the coast of Japan", now - i)
+                                      for i in range(5)])
+        alien.insert_articles(conn, [(f"https://dup{i}.com/story", "Magnitude 7.1 earthquake strikes off the coast of Japan", "news",
+                                      f"dup{i}.com", "/p", now - i, 0, 0, 1, 0, 0) for i in range(5)])
+    conn.execute("ANALYZE")
+
+
+@pytest.fixture(params=["profile", "shared"])
+def populated_db(request, tmp_path, monkeypatch):
+    if request.param == "profile": db_path = tmp_path / "news_feed_test.db"
+    else:
+        monkeypatch.setattr(alien, "CONFIG_DIR", tmp_path)
+        monkeypatch.setattr(alien, "CONFIG_FILE", tmp_path / "config.ini")
+        monkeypatch.setattr(alien, "SHARED_DB_FILE", tmp_path / "news_feed_shared.db")
+        alien.setup_config()
+        db_path = alien.shared_store_path("Test")
+    monkeypatch.setattr(alien, "DB_FILE", db_path)
+    alien.init_db(db_path)
+    conn = alien.db_connection(db_path)
+    seed_articles(conn)
+    yield conn
+    alien.close_db_connections()
+
+
+@pytest.mark.parametrize("mode", alien.NewsFeedMenu.VIEW_MODES)
+def test_view_queries_use_indexes(populated_db, mode):
+    for name, plan in alien.view_query_plans(populated_db, mode).items():
+        # Index scans read rows in order and stop at LIMIT; a bare table scan reads every row
+        assert not {"SCAN articles", "SCAN a", "SCAN m", "SCAN article_data", "SCAN memberships"} & set(plan), f"{mode} {name}: {plan}"
+        # The shared store sorts only articles tied on created_utc by url ("RIGHT PART OF ORDER BY"), never the whole view
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan, f"{mode} {name}: {plan}"